@@ -0,0 +1,111 @@
+"""Single process that owns the camera and the session counters.
+
+`run_camera_owner` runs `session_loop` from `session_state` against its own
+`SessionState`, publishes that state into the shared status block several
+times a second and acts on start/stop commands left there by the HTTP
+workers in `status_server`.
+"""
+
+from __future__ import annotations
+
+import signal
+import threading
+from typing import Optional
+
+from backend import session_state
+from backend.session_state import SessionConfig, SessionState
+from backend.status_snapshot import COMMAND_START, COMMAND_STOP, Command, SharedStatus
+
+
+PUBLISH_INTERVAL = 0.05  # seconds
+
+
+class CameraOwner:
+    """Applies start/stop commands to one `SessionState`, in the order sent.
+
+    A session loop takes a moment to open and release the camera, so a STOP
+    followed by a START doesn't restart it straight away: the START is kept
+    and its loop launched once the old one has finished.
+    """
+
+    def __init__(self, state: Optional[SessionState] = None) -> None:
+        self.state = state or SessionState()
+        self.loop_thread: Optional[threading.Thread] = None
+        # A STOP arrived and the current loop hasn't exited yet
+        self.stopping = False
+        self.pending_start: Optional[SessionConfig] = None
+
+    def _loop_alive(self) -> bool:
+        return self.loop_thread is not None and self.loop_thread.is_alive()
+
+    def handle(self, command: Command) -> None:
+        if command.command == COMMAND_START:
+            if self._loop_alive() and not self.stopping:
+                # Already running; session_loop would ignore it as well
+                return
+            self.pending_start = SessionConfig(
+                focus_seconds=command.focus_seconds,
+                break_seconds=command.break_seconds,
+            )
+        elif command.command == COMMAND_STOP:
+            self.pending_start = None
+            self.stopping = self._loop_alive()
+            self.state.running = False
+
+    def step(self) -> None:
+        """Keep a pending stop in force, or start the pending session."""
+
+        if self._loop_alive():
+            if self.stopping:
+                # session_loop sets running again once its camera is open
+                self.state.running = False
+            return
+
+        if self.loop_thread is not None:
+            self.loop_thread.join()
+            self.loop_thread = None
+        self.stopping = False
+        if self.pending_start is not None:
+            config, self.pending_start = self.pending_start, None
+            self.loop_thread = threading.Thread(
+                target=session_state.session_loop,
+                args=(config, self.state),
+                name="session-loop",
+                daemon=True,
+            )
+            self.loop_thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        self.pending_start = None
+        self.state.running = False
+        if self.loop_thread is not None:
+            self.loop_thread.join(timeout=timeout)
+
+
+def owner_process(shm_name: str, stop_event) -> None:
+    """Process entry point: leave Ctrl-C to the parent, which sets `stop_event`."""
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    run_camera_owner(shm_name, stop_event)
+
+
+def run_camera_owner(shm_name: str, stop_event) -> None:
+    """Serve commands and publish status until `stop_event` is set."""
+
+    status = SharedStatus(shm_name)
+    owner = CameraOwner()
+    last_command = 0
+
+    try:
+        while not stop_event.is_set():
+            last_command, commands = status.poll_commands(last_command)
+            for command in commands:
+                owner.handle(command)
+            owner.step()
+
+            status.publish(owner.state)
+            stop_event.wait(PUBLISH_INTERVAL)
+    finally:
+        owner.close()
+        status.publish(owner.state)
+        status.close()
@@ -0,0 +1,107 @@
+"""Camera-free stand-in for `PosePipeline` used by the load-test harness.
+
+`FakePosePipeline` produces synthetic BGR frames and a 33-point landmark list
+that slowly squats up and down, so the counters and posture scoring do real
+work without a webcam or a pose model.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import List
+
+import numpy as np
+
+from backend.pose_backends import Landmark
+from backend.pose_utils import draw_landmarks
+
+
+NUM_LANDMARKS = 33
+VISIBILITY = 0.95
+
+
+def synthetic_landmarks(phase: float) -> List[Landmark]:
+    """Build a standing/squatting skeleton; `phase` in [0, 1) is one full rep."""
+
+    # Knee angle swings between ~175 (upright) and ~80 degrees (squat)
+    knee_angle = math.radians(127.5 + 47.5 * math.cos(2 * math.pi * phase))
+    thigh = 0.18
+    torso = 0.28
+
+    lm = [Landmark(0.5, 0.5, 0.0, 0.9) for _ in range(NUM_LANDMARKS)]
+    for side, x in ((0, 0.45), (1, 0.55)):
+        ankle = (x, 0.92)
+        knee = (x, 0.74)
+        hip = (
+            knee[0] + thigh * math.sin(knee_angle),
+            knee[1] + thigh * math.cos(knee_angle),
+        )
+        shoulder = (hip[0], hip[1] - torso)
+        # MediaPipe indices: shoulders 11/12, hips 23/24, knees 25/26, ankles 27/28
+        lm[11 + side] = Landmark(*shoulder, 0.0, VISIBILITY)
+        lm[23 + side] = Landmark(*hip, 0.0, VISIBILITY)
+        lm[25 + side] = Landmark(*knee, 0.0, VISIBILITY)
+        lm[27 + side] = Landmark(*ankle, 0.0, VISIBILITY)
+        lm[7 + side] = Landmark(shoulder[0], shoulder[1] - 0.1, 0.0, VISIBILITY)  # ears
+
+    mid_x = (lm[11].x + lm[12].x) / 2
+    lm[0] = Landmark(mid_x, lm[11].y - 0.12, 0.0, VISIBILITY)  # nose
+    return lm
+
+
+class FakePosePipeline:
+    """Drop-in replacement for `PosePipeline` with no camera or model.
+
+    `fps` paces `read()` like a real camera would; `rep_seconds` is how long
+    one synthetic squat takes.
+    """
+
+    def __init__(
+        self,
+        camera_index: int = 0,
+        frame_width: int = 640,
+        frame_height: int = 360,
+        draw_landmarks: bool = True,
+        fps: float = 30.0,
+        rep_seconds: float = 2.0,
+        **_ignored,
+    ):
+        self.camera_index = camera_index
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.draw_landmarks_flag = draw_landmarks
+        self.frame_interval = 1.0 / fps if fps > 0 else 0.0
+        self.rep_seconds = rep_seconds
+
+        rng = np.random.default_rng(0)
+        # Noisy background so JPEG encoding cost resembles a real scene
+        self._background = rng.integers(
+            0, 255, (frame_height, frame_width, 3), dtype=np.uint8
+        )
+        self._start = time.monotonic()
+        self._next_frame = self._start
+
+    def read(self):
+        """Return (frame_bgr, landmarks) at the configured frame rate."""
+
+        now = time.monotonic()
+        if self._next_frame > now:
+            time.sleep(self._next_frame - now)
+        self._next_frame = max(self._next_frame + self.frame_interval, time.monotonic())
+
+        return self.process(self._background.copy())
+
+    def process(self, frame):
+        """Pretend to run pose on an externally supplied frame."""
+
+        elapsed = time.monotonic() - self._start
+        landmarks = synthetic_landmarks((elapsed / self.rep_seconds) % 1.0)
+
+        if self.draw_landmarks_flag:
+            draw_landmarks(frame, landmarks)
+
+        return frame, landmarks
+
+    def release(self):
+        pass
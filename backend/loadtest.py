@@ -0,0 +1,420 @@
+"""HTTP load-test harness for `server.py`, `session_state.py` and `status_server.py`.
+
+The selected app runs in a child process with `PosePipeline` swapped for
+`FakePosePipeline`, so no camera is needed. The parent drives MJPEG preview
+subscribers and `/session/status` pollers against it and reports request
+latency percentiles, delivered fps per preview client, server event-loop lag
+and server CPU use. For `status_server` the camera owner gets its own
+process next to `--workers` HTTP workers; with more than one worker the
+CPU figure covers all of them and event-loop lag isn't measured.
+
+    python -m backend.loadtest --app server --mjpeg 4 --pollers 50 --duration 30
+    python -m backend.loadtest --app status_server --workers 4 --pollers 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import functools
+import importlib
+import json
+import multiprocessing as mp
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from backend.fake_pipeline import FakePosePipeline
+
+
+APPS = {
+    "server": "backend.server",
+    "session_state": "backend.session_state",
+    "status_server": "backend.status_server",
+}
+
+MJPEG_BOUNDARY = b"--frame\r\n"
+LAG_PROBE_INTERVAL = 0.01  # seconds
+CPU_SAMPLE_INTERVAL = 0.25  # seconds
+
+
+@dataclass
+class LoadTestConfig:
+    app: str = "server"
+    host: str = "127.0.0.1"
+    port: int = 8765
+    mjpeg_clients: int = 1
+    status_pollers: int = 10
+    poll_interval: float = 0.25
+    duration: float = 20.0
+    warmup: float = 3.0
+    camera_fps: float = 30.0
+    workers: int = 1
+
+
+@dataclass
+class ClientStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    mjpeg_fps: List[float] = field(default_factory=list)
+
+
+def _run_fake_owner(shm_name: str, camera_fps: float, stop_event) -> None:
+    """Grandchild process: camera owner for status_server with a fake pipeline."""
+
+    from backend import session_state
+    from backend.camera_owner import owner_process
+
+    session_state.PosePipeline = functools.partial(FakePosePipeline, fps=camera_fps)
+    owner_process(shm_name, stop_event)
+
+
+def _cpu_seconds(pid: int) -> Optional[float]:
+    """User + system CPU time of another process (Linux /proc only)."""
+
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # utime and stime are fields 14 and 15 of the full line
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _serve_workers(import_string: str, host: str, port: int, workers: int, stop_event):
+    """Run `workers` uvicorn processes and sample their combined CPU time."""
+
+    import uvicorn
+    from uvicorn.supervisors import Multiprocess
+
+    # uvicorn hands its stdin fd to the workers; in this child it is a
+    # devnull handle they can't reopen
+    sys.stdin = None
+    config = uvicorn.Config(import_string, host=host, port=port, workers=workers,
+                            log_level="warning")
+    supervisor = Multiprocess(config, sockets=[config.bind_socket()])
+    cpu_samples: List[Tuple[float, float]] = []
+
+    def sample():
+        while not stop_event.wait(CPU_SAMPLE_INTERVAL):
+            times = [_cpu_seconds(p.pid) for p in supervisor.processes if p.pid is not None]
+            if times and None not in times:
+                cpu_samples.append((time.monotonic(), sum(times)))
+        supervisor.should_exit.set()
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    supervisor.run()
+    return {"lag": [], "cpu": cpu_samples}
+
+
+def _serve(app_name: str, host: str, port: int, camera_fps: float, workers: int,
+           stop_event, conn) -> None:
+    """Child process: run the app with a fake pipeline and probe its event loop."""
+
+    import uvicorn
+
+    fake = functools.partial(FakePosePipeline, fps=camera_fps)
+    owner = None
+    if app_name == "status_server":
+        from backend.status_server import STATUS_SHM_ENV
+        from backend.status_snapshot import SharedStatus
+
+        status = SharedStatus(create=True)
+        os.environ[STATUS_SHM_ENV] = status.name
+        ctx = mp.get_context("spawn")
+        owner_stop = ctx.Event()
+        owner = ctx.Process(target=_run_fake_owner, args=(status.name, camera_fps, owner_stop))
+        owner.start()
+
+    if workers > 1:
+        # Workers are fresh processes; they find the block through the environment
+        try:
+            stats = _serve_workers(f"{APPS[app_name]}:app", host, port, workers, stop_event)
+        finally:
+            owner_stop.set()
+            owner.join(10.0)
+            status.close()
+        conn.send(stats)
+        conn.close()
+        return
+
+    module = importlib.import_module(APPS[app_name])
+    if hasattr(module, "PosePipeline"):
+        module.PosePipeline = fake
+
+    server = uvicorn.Server(
+        uvicorn.Config(module.app, host=host, port=port, log_level="warning")
+    )
+    lag_samples: List[Tuple[float, float]] = []
+    cpu_samples: List[Tuple[float, float]] = []
+
+    async def lag_probe():
+        last_cpu_sample = 0.0
+        while not server.should_exit:
+            start = time.monotonic()
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            now = time.monotonic()
+            lag_samples.append((now, max(0.0, now - start - LAG_PROBE_INTERVAL)))
+            if now - last_cpu_sample >= CPU_SAMPLE_INTERVAL:
+                cpu_samples.append((now, time.process_time()))
+                last_cpu_sample = now
+            if stop_event.is_set():
+                server.should_exit = True
+
+    async def run():
+        probe = asyncio.create_task(lag_probe())
+        await server.serve()
+        probe.cancel()
+
+    asyncio.run(run())
+    if owner is not None:
+        owner_stop.set()
+        owner.join(10.0)
+        status.close()
+    conn.send({"lag": lag_samples, "cpu": cpu_samples})
+    conn.close()
+
+
+async def _wait_until_ready(client: httpx.AsyncClient, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get("/session/status")
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not become ready in time")
+
+
+async def _poll_status(
+    client: httpx.AsyncClient,
+    stats: ClientStats,
+    interval: float,
+    measure_start: float,
+    deadline: float,
+) -> None:
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        try:
+            response = await client.get("/session/status")
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        end = time.monotonic()
+        if start >= measure_start:
+            if ok:
+                stats.latencies.append(end - start)
+            else:
+                stats.errors += 1
+        await asyncio.sleep(max(0.0, interval - (end - start)))
+
+
+async def _watch_mjpeg(
+    client: httpx.AsyncClient,
+    stats: ClientStats,
+    measure_start: float,
+    deadline: float,
+) -> None:
+    frames = 0
+    tail = b""
+    try:
+        async with client.stream("GET", "/session/preview") as response:
+            async for chunk in response.aiter_bytes():
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                data = tail + chunk
+                if now >= measure_start:
+                    frames += data.count(MJPEG_BOUNDARY)
+                # Keep enough bytes to catch a boundary split across chunks
+                tail = data[-(len(MJPEG_BOUNDARY) - 1):]
+    except httpx.HTTPError:
+        stats.errors += 1
+        return
+    stats.mjpeg_fps.append(frames / max(deadline - measure_start, 1e-9))
+
+
+async def _drive(config: LoadTestConfig) -> Tuple[ClientStats, float, float]:
+    base_url = f"http://{config.host}:{config.port}"
+    limits = httpx.Limits(max_connections=config.mjpeg_clients + config.status_pollers + 4)
+    timeout = httpx.Timeout(10.0, read=None)
+    stats = ClientStats()
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        await _wait_until_ready(client)
+        if config.app == "server":
+            await client.post(
+                "/session/start",
+                json={"focus_seconds": 60, "break_seconds": 60, "mode": "break"},
+            )
+        else:
+            await client.post(
+                "/session/start",
+                json={"focus_seconds": int(config.duration) + 60, "break_seconds": 60},
+            )
+
+        measure_start = time.monotonic() + config.warmup
+        deadline = measure_start + config.duration
+
+        tasks = [
+            _poll_status(client, stats, config.poll_interval, measure_start, deadline)
+            for _ in range(config.status_pollers)
+        ]
+        if config.app == "server":
+            tasks += [
+                _watch_mjpeg(client, stats, measure_start, deadline)
+                for _ in range(config.mjpeg_clients)
+            ]
+        await asyncio.gather(*tasks)
+
+        try:
+            await client.post("/session/stop")
+        except httpx.HTTPError:
+            pass
+
+    return stats, measure_start, deadline
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    arr = np.asarray(values) * 1000.0
+    p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99), "max": float(arr.max())}
+
+
+def _cpu_percent(samples: List[Tuple[float, float]], start: float, end: float) -> float:
+    window = [s for s in samples if start <= s[0] <= end]
+    if len(window) < 2:
+        return 0.0
+    (t0, cpu0), (t1, cpu1) = window[0], window[-1]
+    return 100.0 * (cpu1 - cpu0) / max(t1 - t0, 1e-9)
+
+
+def run_load_test(config: LoadTestConfig) -> dict:
+    """Start the app in a child process, drive it, and return a report dict."""
+
+    if config.app not in APPS:
+        raise ValueError(f"Unknown app '{config.app}', expected one of {sorted(APPS)}")
+    if config.workers > 1 and config.app != "status_server":
+        # The other apps keep their session in process memory
+        raise ValueError("Only status_server can run with more than one worker")
+
+    ctx = mp.get_context("spawn")
+    stop_event = ctx.Event()
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(
+        target=_serve,
+        args=(config.app, config.host, config.port, config.camera_fps, config.workers,
+              stop_event, child_conn),
+    )
+    proc.start()
+
+    server_stats: Optional[dict] = None
+    try:
+        stats, measure_start, deadline = asyncio.run(_drive(config))
+    finally:
+        stop_event.set()
+        if parent_conn.poll(15.0):
+            server_stats = parent_conn.recv()
+        proc.join(5.0)
+        if proc.is_alive():
+            proc.terminate()
+
+    lags = []
+    cpu = 0.0
+    lag_measured = config.workers == 1
+    if server_stats is not None:
+        lags = [lag for t, lag in server_stats["lag"] if measure_start <= t <= deadline]
+        cpu = _cpu_percent(server_stats["cpu"], measure_start, deadline)
+
+    requests = len(stats.latencies)
+    return {
+        "app": config.app,
+        "workers": config.workers,
+        "mjpeg_clients": config.mjpeg_clients if config.app == "server" else 0,
+        "status_pollers": config.status_pollers,
+        "duration_s": config.duration,
+        "status_requests": requests,
+        "status_rps": requests / config.duration,
+        "status_errors": stats.errors,
+        "status_latency_ms": _percentiles(stats.latencies),
+        "mjpeg_fps_per_client": [round(f, 2) for f in stats.mjpeg_fps],
+        "event_loop_lag_ms": _percentiles(lags) if lag_measured else None,
+        "server_cpu_percent": cpu,
+    }
+
+
+def _print_report(report: dict) -> None:
+    lat = report["status_latency_ms"]
+    lag = report["event_loop_lag_ms"]
+    print(f"App: {report['app']}  "
+          f"({report['workers']} workers, "
+          f"{report['mjpeg_clients']} MJPEG, {report['status_pollers']} pollers, "
+          f"{report['duration_s']:.0f}s)")
+    print(f"Status: {report['status_requests']} requests, "
+          f"{report['status_rps']:.1f} req/s, {report['status_errors']} errors")
+    print(f"  latency ms  p50 {lat['p50']:.1f}  p90 {lat['p90']:.1f}  "
+          f"p99 {lat['p99']:.1f}  max {lat['max']:.1f}")
+    fps = report["mjpeg_fps_per_client"]
+    if fps:
+        print(f"MJPEG fps per client: {fps}  (min {min(fps):.1f})")
+    if lag is None:
+        print("Event loop lag: not measured with several workers")
+    else:
+        print(f"Event loop lag ms  p50 {lag['p50']:.1f}  p90 {lag['p90']:.1f}  "
+              f"p99 {lag['p99']:.1f}  max {lag['max']:.1f}")
+    print(f"Server CPU: {report['server_cpu_percent']:.0f}%")
+
+
+def main() -> None:
+    defaults = LoadTestConfig()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", choices=sorted(APPS), default=defaults.app)
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--mjpeg", type=int, default=defaults.mjpeg_clients,
+                        help="number of /session/preview subscribers (server app only)")
+    parser.add_argument("--pollers", type=int, default=defaults.status_pollers,
+                        help="number of /session/status pollers")
+    parser.add_argument("--poll-interval", type=float, default=defaults.poll_interval)
+    parser.add_argument("--duration", type=float, default=defaults.duration)
+    parser.add_argument("--warmup", type=float, default=defaults.warmup)
+    parser.add_argument("--camera-fps", type=float, default=defaults.camera_fps,
+                        help="frame rate of the fake pose source")
+    parser.add_argument("--workers", type=int, default=defaults.workers,
+                        help="uvicorn worker processes (status_server app only)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run_load_test(
+        LoadTestConfig(
+            app=args.app,
+            host=args.host,
+            port=args.port,
+            mjpeg_clients=args.mjpeg,
+            status_pollers=args.pollers,
+            poll_interval=args.poll_interval,
+            duration=args.duration,
+            warmup=args.warmup,
+            camera_fps=args.camera_fps,
+            workers=args.workers,
+        )
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
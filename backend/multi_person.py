@@ -0,0 +1,470 @@
+"""Multi-person pose tracking for shared-room break sessions.
+
+People are found with OpenCV's HOG person detector on a fixed-size copy of
+the frame, matched to existing tracks by box overlap so ids stay stable, and each
+track's crop runs through its own pose backend in a thread pool. Every track
+keeps its own `SquatCounter` and `PostureDetector`.
+
+Between detections a track's box follows its own landmarks, so the per-frame
+cost is one fixed-size crop inference per person. The full-frame detector
+runs on its own worker, off the frame path: a scan starts every
+`detect_interval` frames (never more than one at a time) and its boxes are
+applied on the first frame after it finishes.
+Backends that answer with an earlier frame's result (``tasks_live``) can't
+be used, since each result must line up with the crop it came from.
+
+    python -m backend.multi_person
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from backend.exercise_counter import SquatCounter
+from backend.pose_backends import Landmark, PoseBackend, backend_class, create_backend
+from backend.pose_utils import draw_landmarks
+from backend.posture_detector import PostureDetector, PostureResult
+from backend.runtime_config import RuntimeConfig, pin_current_thread, pinned_executor
+
+
+Box = Tuple[int, int, int, int]  # x1, y1, x2, y2 in frame pixels
+Point = Tuple[float, float]  # x, y in frame pixels
+
+
+@dataclass
+class PersonResult:
+    track_id: int
+    box: Box
+    landmarks: Optional[List[Landmark]]
+    reps: int
+    posture: Optional[PostureResult]
+
+
+@dataclass
+class Track:
+    track_id: int
+    box: Box
+    backend: PoseBackend
+    counter: SquatCounter = field(default_factory=SquatCounter)
+    detector: PostureDetector = field(default_factory=PostureDetector)
+    missed: int = 0
+    landmarks: Optional[List[Landmark]] = None
+    # Frame-pixel position of each landmark, None where it isn't visible
+    keypoints: Optional[List[Optional[Point]]] = None
+    posture: Optional[PostureResult] = None
+
+
+def iou(a: Box, b: Box) -> float:
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    if inter == 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / float(area_a + area_b - inter)
+
+
+def keypoints_fill(keypoints: Optional[List[Optional[Point]]], box: Box,
+                   min_inside: float = 0.8, min_height: float = 0.5) -> bool:
+    """
+    True if the visible keypoints sit inside `box` and span at least
+    `min_height` of its height, i.e. the box is this pose's detection.
+    """
+    points = [p for p in keypoints or () if p is not None]
+    if len(points) < 4:
+        return False
+    x1, y1, x2, y2 = box
+    inside = sum(1 for x, y in points if x1 <= x <= x2 and y1 <= y <= y2)
+    ys = [y for _, y in points]
+    return (inside >= min_inside * len(points)
+            and max(ys) - min(ys) >= min_height * (y2 - y1))
+
+
+def keypoints_agree(a: Optional[List[Optional[Point]]], b: Optional[List[Optional[Point]]],
+                    box: Box, tolerance: float = 0.1) -> bool:
+    """True if two poses put their shared visible landmarks in the same places."""
+    if a is None or b is None:
+        return False
+    distances = [
+        np.hypot(pa[0] - pb[0], pa[1] - pb[1])
+        for pa, pb in zip(a, b)
+        if pa is not None and pb is not None
+    ]
+    if len(distances) < 4:
+        return False
+    return float(np.median(distances)) <= tolerance * max(box[3] - box[1], 1)
+
+
+def crop_to_frame(landmarks: List[Landmark], crop: Box, frame_width: int,
+                  frame_height: int) -> List[Landmark]:
+    """Map crop-normalized landmarks back to full-frame normalized coordinates."""
+    x1, y1, x2, y2 = crop
+    crop_w, crop_h = x2 - x1, y2 - y1
+    return [
+        Landmark(
+            (x1 + lm.x * crop_w) / frame_width,
+            (y1 + lm.y * crop_h) / frame_height,
+            lm.z,
+            lm.visibility,
+        )
+        for lm in landmarks
+    ]
+
+
+def _expand(box: Box, margin: float, width: int, height: int) -> Box:
+    x1, y1, x2, y2 = box
+    dx = (x2 - x1) * margin
+    dy = (y2 - y1) * margin
+    return (
+        max(0, int(x1 - dx)),
+        max(0, int(y1 - dy)),
+        min(width, int(x2 + dx)),
+        min(height, int(y2 + dy)),
+    )
+
+
+class PersonDetector:
+    """HOG person detector run at a fixed working width.
+
+    The HOG window is 64x128 and `detectMultiScale` only searches downwards
+    from there, so the smallest person found is 128 px tall at the working
+    resolution. Frames are resized (up if needed) to `detect_width`, which
+    keeps the cost fixed; the 960 px default finds people down to roughly a
+    quarter of a 16:9 frame's height.
+    """
+
+    def __init__(self, detect_width: int = 960, min_confidence: float = 0.3) -> None:
+        if not hasattr(cv2, "HOGDescriptor"):
+            # OpenCV 5 moved HOG out of the base opencv-python wheel
+            raise RuntimeError(
+                "This OpenCV build has no HOG person detector; install "
+                "opencv-contrib-python instead of opencv-python (see requirements.txt)"
+            )
+        self.detect_width = detect_width
+        self.min_confidence = min_confidence
+        self.hog = cv2.HOGDescriptor()
+        self.hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+
+    def detect(self, frame_bgr: np.ndarray) -> List[Box]:
+        height, width = frame_bgr.shape[:2]
+        scale = self.detect_width / float(width)
+        resized = cv2.resize(frame_bgr, None, fx=scale, fy=scale) if scale != 1.0 else frame_bgr
+
+        rects, weights = self.hog.detectMultiScale(resized, winStride=(8, 8), padding=(8, 8))
+        if len(rects) == 0:
+            return []
+        rects = [list(map(int, r)) for r in rects]
+        scores = [float(w) for w in np.ravel(weights)]
+        keep = cv2.dnn.NMSBoxes(rects, scores, self.min_confidence, 0.4)
+
+        boxes = []
+        for i in np.ravel(keep):
+            x, y, w, h = rects[i]
+            boxes.append((
+                int(x / scale),
+                int(y / scale),
+                min(width, int((x + w) / scale)),
+                min(height, int((y + h) / scale)),
+            ))
+        return boxes
+
+
+class PersonTracker:
+    """Greedy IoU matcher that hands out stable track ids."""
+
+    def __init__(
+        self,
+        backend_factory,
+        iou_threshold: float = 0.3,
+        max_missed: int = 15,
+        duplicate_iou: float = 0.7,
+    ) -> None:
+        self.backend_factory = backend_factory
+        self.iou_threshold = iou_threshold
+        # Boxes this close are one person seen twice, not two people overlapping
+        self.duplicate_iou = duplicate_iou
+        self.max_missed = max_missed
+        self.tracks: Dict[int, Track] = {}
+        self._ids = itertools.count(1)
+
+    def update(self, detections: List[Box]) -> None:
+        """Match a fresh set of detections to the current tracks."""
+
+        pairs = sorted(
+            (
+                (iou(track.box, det), track_id, det_index)
+                for track_id, track in self.tracks.items()
+                for det_index, det in enumerate(detections)
+            ),
+            reverse=True,
+        )
+        matched_tracks = set()
+        matched_dets = set()
+        for overlap, track_id, det_index in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if track_id in matched_tracks or det_index in matched_dets:
+                continue
+            track = self.tracks[track_id]
+            track.box = detections[det_index]
+            track.missed = 0
+            matched_tracks.add(track_id)
+            matched_dets.add(det_index)
+
+        # A landmark-derived box can drift below the IoU threshold (e.g. mid
+        # squat); claim the detection if that track's pose fills it
+        for det_index, det in enumerate(detections):
+            if det_index in matched_dets:
+                continue
+            for track_id, track in self.tracks.items():
+                if track_id not in matched_tracks and keypoints_fill(track.keypoints, det):
+                    track.box = det
+                    track.missed = 0
+                    matched_tracks.add(track_id)
+                    matched_dets.add(det_index)
+                    break
+
+        for track_id, track in self.tracks.items():
+            if track_id not in matched_tracks:
+                track.missed += 1
+
+        for det_index, det in enumerate(detections):
+            if det_index in matched_dets:
+                continue
+            # Checked before a track (and its pose model) is created
+            if any(iou(track.box, det) >= self.duplicate_iou for track in self.tracks.values()):
+                continue
+            track_id = next(self._ids)
+            self.tracks[track_id] = Track(track_id, det, self.backend_factory())
+
+        self.prune()
+
+    def duplicates(self, older: Track, newer: Track) -> bool:
+        if iou(older.box, newer.box) >= self.duplicate_iou:
+            return True
+        return keypoints_agree(older.keypoints, newer.keypoints, older.box)
+
+    def suppress_duplicates(self) -> None:
+        """Drop the newer of any two tracks that follow the same person."""
+
+        ids = sorted(self.tracks)
+        dropped = set()
+        for i, older in enumerate(ids):
+            if older in dropped:
+                continue
+            for newer in ids[i + 1:]:
+                if newer not in dropped and self.duplicates(self.tracks[older], self.tracks[newer]):
+                    dropped.add(newer)
+        for track_id in dropped:
+            self.tracks.pop(track_id).backend.close()
+
+    def prune(self) -> None:
+        for track_id in [t for t, track in self.tracks.items() if track.missed > self.max_missed]:
+            self.tracks.pop(track_id).backend.close()
+
+    def close(self) -> None:
+        for track in self.tracks.values():
+            track.backend.close()
+        self.tracks.clear()
+
+
+class MultiPersonPipeline:
+    def __init__(
+        self,
+        camera_index: int = 0,
+        frame_width: int = 640,
+        frame_height: int = 360,
+        backend: Optional[str] = None,
+        backend_options: Optional[dict] = None,
+        max_workers: int = 4,
+        detect_interval: int = 10,
+        crop_height: int = 256,
+        crop_margin: float = 0.15,
+        draw_landmarks: bool = True,
+        runtime: Optional[RuntimeConfig] = None,
+    ):
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.detect_interval = max(detect_interval, 1)
+        self.crop_height = crop_height
+        self.crop_margin = crop_margin
+        self.draw_landmarks_flag = draw_landmarks
+
+        backend_cls = backend_class(backend)
+        if backend_cls.is_async:
+            raise ValueError(
+                f"Pose backend '{backend_cls.name}' returns results from earlier frames "
+                "and can't be used for per-person crops"
+            )
+
+        self.runtime = runtime or RuntimeConfig.from_env()
+        self.runtime.apply()
+        options = {**self.runtime.backend_options(), **(backend_options or {})}
+
+        self.cap = cv2.VideoCapture(camera_index)
+        self.person_detector = PersonDetector()
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="pose",
+            initializer=pin_current_thread,
+            initargs=(self.runtime.inference_cpus,),
+        )
+        # Each track owns a backend so per-person temporal tracking stays intact.
+        # Backends are created on a pinned worker so their own threads inherit it.
+        self.tracker = PersonTracker(
+            lambda: self.pool.submit(create_backend, backend, **options).result()
+        )
+        # HOG takes several frames' worth of time; keep it off the frame path
+        self.detect_executor = pinned_executor(self.runtime.inference_cpus, "person-detect")
+        self._detection: Optional[Future] = None
+        self._next_detect = 0
+        self.frame_index = 0
+
+    def _infer(self, track: Track, frame_bgr: np.ndarray) -> None:
+        """Run pose on one track's crop and update its counters (worker thread)."""
+
+        track.keypoints = None
+        x1, y1, x2, y2 = _expand(track.box, self.crop_margin, self.frame_width, self.frame_height)
+        if x2 - x1 < 8 or y2 - y1 < 8:
+            track.landmarks = None
+            return
+
+        crop = frame_bgr[y1:y2, x1:x2]
+        scale = self.crop_height / float(y2 - y1)
+        crop = cv2.resize(crop, (max(1, int((x2 - x1) * scale)), self.crop_height))
+        crop_rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        local = track.backend.process(crop_rgb)
+        if local is None:
+            track.landmarks = None
+            return
+
+        landmarks = crop_to_frame(local, (x1, y1, x2, y2), self.frame_width, self.frame_height)
+        track.landmarks = landmarks
+        track.keypoints = [
+            (lm.x * self.frame_width, lm.y * self.frame_height) if lm.visibility > 0.5 else None
+            for lm in landmarks
+        ]
+        track.counter.update(landmarks)
+        track.posture = track.detector.analyze(landmarks)
+
+        # Follow the person between detections using their visible landmarks
+        visible = [lm for lm in landmarks if lm.visibility > 0.5]
+        if visible:
+            xs = [lm.x * self.frame_width for lm in visible]
+            ys = [lm.y * self.frame_height for lm in visible]
+            x1, x2, y1, y2 = min(xs), max(xs), min(ys), max(ys)
+            # Keep the person-detector aspect (1:2) so IoU with new detections holds up
+            half_width = max(x2 - x1, (y2 - y1) / 2) / 2
+            center_x = (x1 + x2) / 2
+            track.box = (
+                max(0, int(center_x - half_width)),
+                int(y1),
+                min(self.frame_width, int(center_x + half_width)),
+                int(y2),
+            )
+
+    def process(self, frame_bgr: np.ndarray) -> List[PersonResult]:
+        """Detect/track people in a frame already at the pipeline size."""
+
+        if self._detection is not None and self._detection.done():
+            # Boxes are a few frames old; tracks re-centre on their landmarks
+            self.tracker.update(self._detection.result())
+            self._detection = None
+        if self._detection is None and self.frame_index >= self._next_detect:
+            # Copy: read() draws on this frame while the scan is running
+            self._detection = self.detect_executor.submit(
+                self.person_detector.detect, frame_bgr.copy()
+            )
+            self._next_detect = self.frame_index + self.detect_interval
+        self.frame_index += 1
+
+        tracks = list(self.tracker.tracks.values())
+        for future in [self.pool.submit(self._infer, t, frame_bgr) for t in tracks]:
+            future.result()
+
+        people = []
+        for track in tracks:
+            if track.landmarks is None:
+                track.missed += 1
+            else:
+                track.missed = 0
+            people.append(PersonResult(
+                track_id=track.track_id,
+                box=track.box,
+                landmarks=track.landmarks,
+                reps=track.counter.rep_count,
+                posture=track.posture,
+            ))
+        # Boxes moved with the new landmarks; two tracks may now cover one person
+        self.tracker.suppress_duplicates()
+        self.tracker.prune()
+        return [p for p in people if p.track_id in self.tracker.tracks]
+
+    def read(self):
+        """
+        Reads one frame and tracks everyone in it, returns
+        (frame_bgr, [PersonResult, ...]) or (None, None) on fatal error.
+        """
+        ret, frame = self.cap.read()
+        if not ret or frame is None:
+            print("Error reading frame")
+            return None, None
+
+        frame = cv2.resize(frame, (self.frame_width, self.frame_height))
+        people = self.process(frame)
+
+        if self.draw_landmarks_flag:
+            for person in people:
+                x1, y1, x2, y2 = person.box
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 200, 0), 2)
+                cv2.putText(
+                    frame,
+                    f"#{person.track_id} reps {person.reps}",
+                    (x1, max(0, y1 - 8)),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6,
+                    (255, 200, 0),
+                    2,
+                    cv2.LINE_AA,
+                )
+                if person.landmarks is not None:
+                    draw_landmarks(frame, person.landmarks)
+
+        return frame, people
+
+    def release(self):
+        self.detect_executor.shutdown(wait=True)
+        self.pool.shutdown(wait=True)
+        self.tracker.close()
+        self.cap.release()
+
+
+def main() -> None:
+    """Webcam demo: one counter and posture label per tracked person."""
+
+    pipeline = MultiPersonPipeline()
+    while True:
+        frame, people = pipeline.read()
+        if frame is None:
+            break
+        for person in people:
+            label = person.posture.label if person.posture else "-"
+            print(f"#{person.track_id}: squats {person.reps}, posture {label}")
+
+        cv2.imshow("Multi-person", frame)
+        if cv2.waitKey(1) & 0xFF == 27:
+            break
+
+    pipeline.release()
+    cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
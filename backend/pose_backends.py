@@ -0,0 +1,320 @@
+"""Interchangeable pose-estimation backends.
+
+Every backend takes an RGB frame and returns either `None` (no person) or a
+list of 33 `Landmark` objects in MediaPipe Pose order with normalized x/y, so
+`SquatCounter`, `PostureDetector` and the servers don't care which one ran.
+
+Backends are picked by name through `create_backend()`; the default comes
+from the `POSE_BACKEND` environment variable:
+
+- ``solution``: legacy ``mp.solutions.pose.Pose`` (synchronous ``process()``)
+- ``tasks_video``: MediaPipe Tasks ``PoseLandmarker`` in VIDEO mode
+- ``tasks_live``: MediaPipe Tasks ``PoseLandmarker`` in LIVE_STREAM mode;
+  frames are submitted asynchronously and the latest finished result is
+  returned, so ``process()`` never waits on inference
+- ``onnx``: BlazePose landmark model exported to ONNX, run on the CPU with
+  onnxruntime; it has no person detector, see `OnnxPoseBackend`
+
+The tasks backends load `$POSE_MODEL_PATH` and the onnx backend loads
+`$POSE_ONNX_MODEL_PATH` and needs ``requirements-onnx.txt``; the README
+says where to get the models.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Type
+
+import cv2
+import numpy as np
+
+
+DEFAULT_BACKEND = "solution"
+DEFAULT_TASK_MODEL = "pose_landmarker_full.task"
+DEFAULT_ONNX_MODEL = "pose_landmark_full.onnx"
+NUM_LANDMARKS = 33
+
+
+@dataclass
+class Landmark:
+    x: float
+    y: float
+    z: float = 0.0
+    visibility: float = 0.0
+
+
+class PoseBackend:
+    """Base class: subclasses implement `process()` and optionally `close()`."""
+
+    name = "base"
+    # True when process() returns an earlier frame's result (tasks_live)
+    is_async = False
+
+    def __init__(self) -> None:
+        # Number of inferences that have finished; used by the benchmark
+        self.completed = 0
+
+    def process(self, frame_rgb: np.ndarray) -> Optional[List[Landmark]]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _convert(landmarks) -> List[Landmark]:
+    return [
+        Landmark(lm.x, lm.y, lm.z or 0.0, lm.visibility or 0.0)
+        for lm in landmarks
+    ]
+
+
+class SolutionPoseBackend(PoseBackend):
+    name = "solution"
+
+    def __init__(
+        self,
+        min_detection_confidence: float = 0.5,
+        min_tracking_confidence: float = 0.5,
+        model_complexity: int = 1,
+        **_ignored,
+    ) -> None:
+        super().__init__()
+        import mediapipe as mp
+
+        self.pose = mp.solutions.pose.Pose(
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+
+    def process(self, frame_rgb):
+        result = self.pose.process(frame_rgb)
+        self.completed += 1
+        if result.pose_landmarks is None:
+            return None
+        return _convert(result.pose_landmarks.landmark)
+
+    def close(self):
+        self.pose.close()
+
+
+class _TasksPoseBackend(PoseBackend):
+    running_mode = "VIDEO"
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        min_detection_confidence: float = 0.5,
+        min_tracking_confidence: float = 0.5,
+        **_ignored,
+    ) -> None:
+        super().__init__()
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions, vision
+
+        self._mp = mp
+        self._last_timestamp = -1
+        model_path = model_path or os.environ.get("POSE_MODEL_PATH", DEFAULT_TASK_MODEL)
+
+        options = vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode[self.running_mode],
+            min_pose_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            **self._extra_options(),
+        )
+        self.landmarker = vision.PoseLandmarker.create_from_options(options)
+
+    def _extra_options(self) -> dict:
+        return {}
+
+    def _timestamp_ms(self) -> int:
+        # Tasks API requires strictly increasing timestamps
+        timestamp = int(time.monotonic() * 1000)
+        if timestamp <= self._last_timestamp:
+            timestamp = self._last_timestamp + 1
+        self._last_timestamp = timestamp
+        return timestamp
+
+    def _image(self, frame_rgb):
+        return self._mp.Image(
+            image_format=self._mp.ImageFormat.SRGB,
+            data=np.ascontiguousarray(frame_rgb),
+        )
+
+    def close(self):
+        self.landmarker.close()
+
+
+class TasksVideoPoseBackend(_TasksPoseBackend):
+    name = "tasks_video"
+    running_mode = "VIDEO"
+
+    def process(self, frame_rgb):
+        result = self.landmarker.detect_for_video(self._image(frame_rgb), self._timestamp_ms())
+        self.completed += 1
+        if not result.pose_landmarks:
+            return None
+        return _convert(result.pose_landmarks[0])
+
+
+class TasksLiveStreamPoseBackend(_TasksPoseBackend):
+    name = "tasks_live"
+    running_mode = "LIVE_STREAM"
+    is_async = True
+
+    def __init__(self, **kwargs) -> None:
+        self._lock = threading.Lock()
+        self._latest: Optional[List[Landmark]] = None
+        super().__init__(**kwargs)
+
+    def _extra_options(self) -> dict:
+        return {"result_callback": self._on_result}
+
+    def _on_result(self, result, _image, _timestamp_ms) -> None:
+        landmarks = _convert(result.pose_landmarks[0]) if result.pose_landmarks else None
+        with self._lock:
+            self._latest = landmarks
+            self.completed += 1
+
+    def process(self, frame_rgb):
+        self.landmarker.detect_async(self._image(frame_rgb), self._timestamp_ms())
+        with self._lock:
+            return self._latest
+
+
+class OnnxPoseBackend(PoseBackend):
+    """BlazePose landmark model on onnxruntime's CPU provider.
+
+    Expects the model's first output to hold 5 values per landmark
+    (x, y, z, visibility logit, presence logit) in input-pixel units, and an
+    optional second output with the pose-presence probability.
+
+    The landmark model is meant to see a square crop centred on the person.
+    There is no person detector here: the crop follows the previous frame's
+    landmarks, and when there are none the whole frame is letterboxed to a
+    square (aspect ratio kept). Until it locks on, a person who fills only a
+    small part of the frame may be missed or placed less precisely than with
+    the MediaPipe backends, which run their own detector.
+    """
+
+    name = "onnx"
+    roi_scale = 1.25  # ROI side relative to the previous pose's bounding box
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        min_detection_confidence: float = 0.5,
+        num_threads: int = 0,
+        **_ignored,
+    ) -> None:
+        super().__init__()
+        import onnxruntime as ort
+
+        model_path = model_path or os.environ.get("POSE_ONNX_MODEL_PATH", DEFAULT_ONNX_MODEL)
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.min_presence = min_detection_confidence
+        self._previous: Optional[List[Landmark]] = None
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        shape = model_input.shape
+        # NCHW models have the channel axis first, NHWC models last
+        self.channels_first = shape[1] == 3
+        self.input_height, self.input_width = (
+            (shape[2], shape[3]) if self.channels_first else (shape[1], shape[2])
+        )
+
+    def _roi(self, width: int, height: int):
+        """Square region (x0, y0, side) in frame pixels to feed the model."""
+
+        if self._previous is not None:
+            points = [
+                (lm.x * width, lm.y * height)
+                for lm in self._previous
+                if lm.visibility > 0.5
+            ]
+            if len(points) >= 4:
+                xs, ys = zip(*points)
+                side = max(max(xs) - min(xs), max(ys) - min(ys)) * self.roi_scale
+                cx, cy = (max(xs) + min(xs)) / 2, (max(ys) + min(ys)) / 2
+                if side >= 1.0:
+                    return cx - side / 2, cy - side / 2, side
+        # No usable previous pose: letterbox the whole frame
+        side = float(max(width, height))
+        return (width - side) / 2, (height - side) / 2, side
+
+    def process(self, frame_rgb):
+        height, width = frame_rgb.shape[:2]
+        x0, y0, side = self._roi(width, height)
+        sx, sy = self.input_width / side, self.input_height / side
+        # Crop + scale in one warp; anything outside the frame is padded black
+        transform = np.float32([[sx, 0, -x0 * sx], [0, sy, -y0 * sy]])
+        crop = cv2.warpAffine(frame_rgb, transform, (self.input_width, self.input_height))
+        tensor = crop.astype(np.float32) / 255.0
+        if self.channels_first:
+            tensor = tensor.transpose(2, 0, 1)
+
+        outputs = self.session.run(None, {self.input_name: tensor[np.newaxis]})
+        self.completed += 1
+        if len(outputs) > 1 and float(np.ravel(outputs[1])[0]) < self.min_presence:
+            self._previous = None
+            return None
+
+        raw = np.asarray(outputs[0]).reshape(-1, 5)[:NUM_LANDMARKS]
+        visibility = 1.0 / (1.0 + np.exp(-raw[:, 3]))
+        # Map ROI pixels back to frame-normalized coordinates
+        landmarks = [
+            Landmark(
+                float((x0 + x / sx) / width),
+                float((y0 + y / sy) / height),
+                float(z / sx / width),
+                float(v),
+            )
+            for (x, y, z, _, _), v in zip(raw, visibility)
+        ]
+        self._previous = landmarks
+        return landmarks
+
+
+BACKENDS: Dict[str, Type[PoseBackend]] = {
+    cls.name: cls
+    for cls in (
+        SolutionPoseBackend,
+        TasksVideoPoseBackend,
+        TasksLiveStreamPoseBackend,
+        OnnxPoseBackend,
+    )
+}
+
+
+def backend_class(name: Optional[str] = None) -> Type[PoseBackend]:
+    """Look up a backend class by name (defaults to `$POSE_BACKEND`)."""
+
+    name = name or os.environ.get("POSE_BACKEND", DEFAULT_BACKEND)
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown pose backend '{name}', expected one of {sorted(BACKENDS)}"
+        ) from None
+
+
+def create_backend(name: Optional[str] = None, **options) -> PoseBackend:
+    """Instantiate a backend by name (defaults to `$POSE_BACKEND`)."""
+
+    return backend_class(name)(**options)
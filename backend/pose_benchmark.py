@@ -0,0 +1,367 @@
+"""Throughput benchmark for the pose backends.
+
+Replays the same frames through every backend that can be built on this host
+and reports per-call latency, inference throughput and how often a person was
+found, then names the fastest one. Set `POSE_BACKEND` to the winner.
+Backends that find a person much less often than the best one are not
+eligible, and no winner is named on synthetic frames (no real person in
+them, so the MediaPipe backends only run their detector).
+
+With ``--sweep`` it instead runs the full `PosePipeline.process` + JPEG
+encode path for one backend under a grid of `RuntimeConfig` thread counts and
+CPU sets, each in a fresh process, and recommends the POSE_* settings with
+the best throughput whose p95 latency stays close to the best seen.
+
+    python -m backend.pose_benchmark --video clip.mp4 --frames 300
+    python -m backend.pose_benchmark --sweep --backend tasks_video
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from backend.fake_pipeline import FakePosePipeline
+from backend.pose_backends import BACKENDS, create_backend
+from backend.pose_pipeline import PosePipeline
+from backend.runtime_config import RuntimeConfig, pinned_executor
+
+
+# A backend must find a person in at least this share of the frames the
+# best backend found one in to be named fastest
+DETECTION_SLACK = 0.8
+
+
+def load_frames(
+    video: Optional[str],
+    camera_index: Optional[int],
+    count: int,
+    width: int = 640,
+    height: int = 360,
+) -> Tuple[List[np.ndarray], bool]:
+    """
+    Collect `count` RGB frames from a video file, a camera, or synthetic data.
+    Returns (frames, synthetic).
+    """
+
+    frames: List[np.ndarray] = []
+    source = video if video is not None else camera_index
+    if source is not None:
+        cap = cv2.VideoCapture(source)
+        while len(frames) < count:
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                if video is None or not frames:
+                    break
+                # Loop short clips until we have enough frames
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                continue
+            frame = cv2.resize(frame, (width, height))
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        cap.release()
+
+    if not frames:
+        print("No video source available, using synthetic frames")
+        fake = FakePosePipeline(frame_width=width, frame_height=height, fps=0)
+        for _ in range(count):
+            frame, _ = fake.read()
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        return frames, True
+    return frames, False
+
+
+def _wait_for_results(backend, target: int, idle_timeout: float = 0.5) -> None:
+    # Async backends finish after process() returns; wait until they go idle
+    last = backend.completed
+    idle_since = time.perf_counter()
+    while backend.completed < target:
+        time.sleep(0.005)
+        if backend.completed != last:
+            last = backend.completed
+            idle_since = time.perf_counter()
+        elif time.perf_counter() - idle_since > idle_timeout:
+            break
+
+
+def benchmark_backend(
+    name: str, frames: List[np.ndarray], warmup: int = 10, **options
+) -> dict:
+    """Run one backend over `frames` and return its timings."""
+
+    backend = create_backend(name, **options)
+    try:
+        for frame in frames[:warmup]:
+            backend.process(frame)
+        _wait_for_results(backend, warmup)
+
+        completed_before = backend.completed
+        latencies = []
+        detected = 0
+        start = time.perf_counter()
+        for frame in frames:
+            call_start = time.perf_counter()
+            landmarks = backend.process(frame)
+            latencies.append(time.perf_counter() - call_start)
+            if landmarks is not None:
+                detected += 1
+        _wait_for_results(backend, completed_before + len(frames))
+        elapsed = time.perf_counter() - start
+        completed = backend.completed - completed_before
+    finally:
+        backend.close()
+
+    latency_ms = np.asarray(latencies) * 1000.0
+    p50, p95 = np.percentile(latency_ms, [50, 95])
+    return {
+        "backend": name,
+        "frames": len(frames),
+        "inferences": completed,
+        "inferences_per_s": completed / elapsed,
+        "call_latency_ms": {"p50": float(p50), "p95": float(p95)},
+        "detection_rate": detected / len(frames),
+    }
+
+
+def run_benchmark(
+    frames: List[np.ndarray],
+    backends: Optional[List[str]] = None,
+    warmup: int = 10,
+    synthetic: bool = False,
+) -> dict:
+    """Benchmark each backend; ones that can't start here are listed as skipped."""
+
+    results = []
+    skipped = {}
+    for name in backends or list(BACKENDS):
+        try:
+            results.append(benchmark_backend(name, frames, warmup=warmup))
+        except Exception as exc:  # missing package, model file, ...
+            skipped[name] = f"{type(exc).__name__}: {exc}"
+
+    results.sort(key=lambda r: r["inferences_per_s"], reverse=True)
+
+    fastest = None
+    excluded = []
+    if results and not synthetic:
+        best_rate = max(r["detection_rate"] for r in results)
+        for r in results:
+            if r["detection_rate"] < best_rate * DETECTION_SLACK:
+                excluded.append(r["backend"])
+            elif fastest is None:
+                fastest = r["backend"]
+    return {
+        "fastest": fastest,
+        "synthetic": synthetic,
+        "low_detection": excluded,
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def _available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def sweep_grid() -> List[RuntimeConfig]:
+    """Thread counts and CPU splits worth trying on this machine."""
+
+    cpus = _available_cpus()
+    n = len(cpus)
+    thread_counts = sorted({1, 2, max(n // 2, 1), n})
+    configs = []
+    for cv_threads in thread_counts:
+        # No pinning: everything shares every core
+        configs.append(RuntimeConfig(cv_threads=cv_threads, inference_threads=n))
+        if n < 2 or not hasattr(os, "sched_setaffinity"):
+            continue
+        # Reserve k cores for inference, the rest for capture and encoding
+        for k in sorted({1, max(n // 2, 1), n - 1}):
+            inference = frozenset(cpus[:k])
+            rest = frozenset(cpus[k:])
+            configs.append(RuntimeConfig(
+                cv_threads=cv_threads,
+                inference_threads=k,
+                capture_cpus=rest,
+                inference_cpus=inference,
+                encode_cpus=rest,
+            ))
+    return configs
+
+
+def _sweep_worker(frames_path: str, backend: Optional[str], runtime: RuntimeConfig,
+                  warmup: int, conn) -> None:
+    """Child process: time process() + JPEG encode under one runtime config."""
+
+    try:
+        frames = np.load(frames_path, mmap_mode="r")
+        pipeline = PosePipeline(
+            camera_index=None,
+            frame_width=frames.shape[2],
+            frame_height=frames.shape[1],
+            draw_landmarks=False,
+            backend=backend,
+            runtime=runtime,
+        )
+        encoder = pinned_executor(runtime.encode_cpus, "jpeg-encode")
+        encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), 70]
+
+        def step(frame):
+            out, _ = pipeline.process(np.array(frame))
+            encoder.submit(cv2.imencode, ".jpg", out, encode_params).result()
+
+        for frame in frames[:warmup]:
+            step(frame)
+        latencies = []
+        start = time.perf_counter()
+        for frame in frames:
+            frame_start = time.perf_counter()
+            step(frame)
+            latencies.append(time.perf_counter() - frame_start)
+        elapsed = time.perf_counter() - start
+        pipeline.release()
+        encoder.shutdown()
+
+        latency_ms = np.asarray(latencies) * 1000.0
+        p50, p95 = np.percentile(latency_ms, [50, 95])
+        conn.send({"fps": len(frames) / elapsed, "p50_ms": float(p50), "p95_ms": float(p95)})
+    except Exception as exc:
+        conn.send({"error": f"{type(exc).__name__}: {exc}"})
+    finally:
+        conn.close()
+
+
+def _describe(runtime: RuntimeConfig) -> dict:
+    def cpus(value):
+        return ",".join(map(str, sorted(value))) if value else ""
+
+    return {
+        "POSE_CV_THREADS": runtime.cv_threads,
+        "POSE_INFERENCE_THREADS": runtime.inference_threads,
+        "POSE_CAPTURE_CPUS": cpus(runtime.capture_cpus),
+        "POSE_INFERENCE_CPUS": cpus(runtime.inference_cpus),
+        "POSE_ENCODE_CPUS": cpus(runtime.encode_cpus),
+    }
+
+
+def run_sweep(
+    frames: List[np.ndarray],
+    backend: Optional[str] = None,
+    warmup: int = 10,
+    latency_slack: float = 1.2,
+) -> dict:
+    """Benchmark every `sweep_grid()` config, each in its own process."""
+
+    ctx = mp.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        frames_path = os.path.join(tmp, "frames.npy")
+        np.save(frames_path, np.stack([cv2.cvtColor(f, cv2.COLOR_RGB2BGR) for f in frames]))
+        for runtime in sweep_grid():
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            proc = ctx.Process(
+                target=_sweep_worker,
+                args=(frames_path, backend, runtime, warmup, child_conn),
+            )
+            proc.start()
+            child_conn.close()
+            try:
+                outcome = parent_conn.recv()
+            except EOFError:
+                outcome = {"error": f"worker exited with code {proc.exitcode}"}
+            proc.join()
+            results.append({"settings": _describe(runtime), **outcome})
+
+    ok = [r for r in results if "error" not in r]
+    recommended = None
+    if ok:
+        # Fastest config among those whose tail latency is near the best one
+        best_p95 = min(r["p95_ms"] for r in ok)
+        candidates = [r for r in ok if r["p95_ms"] <= best_p95 * latency_slack]
+        recommended = max(candidates, key=lambda r: r["fps"])["settings"]
+    return {"backend": backend, "results": results, "recommended": recommended}
+
+
+def _print_sweep(report: dict) -> None:
+    print(f"{'fps':>7} {'p50 ms':>8} {'p95 ms':>8}  settings")
+    for r in report["results"]:
+        settings = " ".join(f"{k}={v}" for k, v in r["settings"].items() if v not in (None, ""))
+        if "error" in r:
+            print(f"{'-':>7} {'-':>8} {'-':>8}  {settings}  ({r['error']})")
+        else:
+            print(f"{r['fps']:>7.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}  {settings}")
+    if report["recommended"]:
+        print("Recommended:")
+        for key, value in report["recommended"].items():
+            if value not in (None, ""):
+                print(f"  {key}={value}")
+    else:
+        print("No configuration completed")
+    if report.get("synthetic"):
+        print("Timed on synthetic frames with no real person; "
+              "MediaPipe backends skip landmark inference, so use --video or a camera.")
+
+
+def _print_report(report: dict) -> None:
+    print(f"{'backend':<12} {'inf/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'detected':>9}")
+    for r in report["results"]:
+        lat = r["call_latency_ms"]
+        print(
+            f"{r['backend']:<12} {r['inferences_per_s']:>8.1f} {lat['p50']:>8.2f} "
+            f"{lat['p95']:>8.2f} {r['detection_rate']:>8.0%}"
+        )
+    for name, reason in report["skipped"].items():
+        print(f"{name:<12} skipped ({reason})")
+    for name in report["low_detection"]:
+        print(f"{name:<12} not ranked: finds a person far less often than the best backend")
+    if report["synthetic"]:
+        print("Synthetic frames contain no real person; no fastest backend is named. "
+              "Use --video or a camera.")
+    elif report["fastest"]:
+        print(f"Fastest on this host: {report['fastest']}")
+    else:
+        print("No pose backend could be started")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", help="video file to replay (default: camera 0)")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--synthetic", action="store_true",
+                        help="skip the camera and use synthetic frames")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS),
+                        help="backend to include (repeatable, default: all)")
+    parser.add_argument("--sweep", action="store_true",
+                        help="sweep thread/CPU settings for one backend instead")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    camera = None if args.synthetic else args.camera
+    frames, synthetic = load_frames(args.video, camera, args.frames)
+    if args.sweep:
+        backend = args.backend[0] if args.backend else None
+        report = run_sweep(frames, backend, warmup=args.warmup)
+        report["synthetic"] = synthetic
+        printer = _print_sweep
+    else:
+        report = run_benchmark(frames, args.backend, warmup=args.warmup, synthetic=synthetic)
+        printer = _print_report
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        printer(report)
+
+
+if __name__ == "__main__":
+    main()
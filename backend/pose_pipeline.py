@@ -1,36 +1,63 @@
 # Pose detection and processing pipeline
+from typing import Optional
+
 import cv2
-import mediapipe as mp
+
+from backend.pose_backends import create_backend
+from backend.pose_utils import draw_landmarks
+from backend.runtime_config import RuntimeConfig, pinned_executor
 
 
 class PosePipeline:
     def __init__(
         self,
-        camera_index: int = 0,
+        camera_index: Optional[int] = 0,
         frame_width: int = 640,
         frame_height: int = 360,
         min_detection_confidence: float = 0.5,
         min_tracking_confidence: float = 0.5,
         draw_landmarks: bool = True,
+        backend: Optional[str] = None,
+        backend_options: Optional[dict] = None,
+        runtime: Optional[RuntimeConfig] = None,
     ):
         self.camera_index = camera_index
         self.frame_width = frame_width
         self.frame_height = frame_height
         self.draw_landmarks_flag = draw_landmarks
 
-        self.cap = cv2.VideoCapture(self.camera_index)
+        # Thread/CPU budget, from the POSE_* environment unless given
+        self.runtime = runtime or RuntimeConfig.from_env()
+        self.runtime.apply()
+        # Pinned workers only exist when CPU sets are configured
+        self._capture = (
+            pinned_executor(self.runtime.capture_cpus, "pose-capture")
+            if self.runtime.capture_cpus else None
+        )
+        self._inference = (
+            pinned_executor(self.runtime.inference_cpus, "pose-inference")
+            if self.runtime.inference_cpus else None
+        )
 
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_pose = mp.solutions.pose
+        # camera_index=None: no local camera, frames come in through process()
+        self.cap = None
+        if camera_index is not None:
+            self.cap = self._run(self._capture, cv2.VideoCapture, self.camera_index)
 
-        self.pose = self.mp_pose.Pose(
+        # backend=None picks $POSE_BACKEND (see pose_backends)
+        options = {**self.runtime.backend_options(), **(backend_options or {})}
+        self.backend = self._run(
+            self._inference,
+            create_backend,
+            backend,
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence,
+            **options,
         )
 
         # Simple readiness check
-        while True:
-            ok, frame = self.cap.read()
+        while self.cap is not None:
+            ok, frame = self._run(self._capture, self.cap.read)
             if ok and frame is not None:
                 break
             print("Waiting for video")
@@ -40,35 +67,43 @@ class PosePipeline:
         Reads one frame, runs pose detection, returns
         (frame_bgr, landmarks_list) or (None, None) on fatal error.
         """
-        ret, frame = self.cap.read()
+        ret, frame = self._run(self._capture, self.cap.read)
         if not ret or frame is None:
             print("Error reading frame")
             return None, None
 
-        frame = cv2.resize(frame, (self.frame_width, self.frame_height))
+        return self.process(frame)
+
+    def process(self, frame):
+        """
+        Runs pose detection on a BGR frame from any source, returns
+        (frame_bgr, landmarks_list) at the pipeline's frame size.
+        """
+        if frame.shape[1] != self.frame_width or frame.shape[0] != self.frame_height:
+            frame = cv2.resize(frame, (self.frame_width, self.frame_height))
 
-        # convert to RGB for Mediapipe
+        # convert to RGB for the pose backend
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         frame_rgb.flags.writeable = False
 
-        result = self.pose.process(frame_rgb)
-        landmarks = getattr(result.pose_landmarks, "landmark", None)
+        landmarks = self._run(self._inference, self.backend.process, frame_rgb)
 
-        # back to BGR for display
-        frame_rgb.flags.writeable = True
-        frame_bgr = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
+        if self.draw_landmarks_flag and landmarks is not None:
+            draw_landmarks(frame, landmarks)
 
-        if self.draw_landmarks_flag and result.pose_landmarks is not None:
-            self.mp_drawing.draw_landmarks(
-                frame_bgr,
-                result.pose_landmarks,
-                self.mp_pose.POSE_CONNECTIONS,
-                self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                self.mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2),
-            )
+        return frame, landmarks
 
-        return frame_bgr, landmarks
+    @staticmethod
+    def _run(executor, fn, *args, **kwargs):
+        # Run on the pinned worker when there is one, inline otherwise
+        if executor is None:
+            return fn(*args, **kwargs)
+        return executor.submit(fn, *args, **kwargs).result()
 
     def release(self):
-        self.cap.release()
-        self.pose.close()
+        if self.cap is not None:
+            self._run(self._capture, self.cap.release)
+        self._run(self._inference, self.backend.close)
+        for executor in (self._capture, self._inference):
+            if executor is not None:
+                executor.shutdown()
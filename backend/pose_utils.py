@@ -1,5 +1,21 @@
+import cv2
 import numpy as np
 
+# MediaPipe Pose landmark indices used across the backend
+NOSE = 0
+LEFT_EAR, RIGHT_EAR = 7, 8
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_HIP, RIGHT_HIP = 23, 24
+
+# Same skeleton as mp.solutions.pose.POSE_CONNECTIONS
+POSE_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20),
+    (11, 23), (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28),
+    (27, 29), (28, 30), (29, 31), (30, 32), (27, 31), (28, 32),
+)
+
 def find_angle(a, b, c, minVis=0.8):
     # Finds the angle at b with endpoints a and c
     # Returns -1 if below minimum visibility threshold
@@ -29,4 +45,20 @@ def leg_state(angle):
     elif angle < 150:
         return 2 # transition
     else:
-        return 3 # upright
\ No newline at end of file
+        return 3 # upright
+
+
+def draw_landmarks(frame, landmarks, minVis=0.5):
+    # Draws the pose skeleton in place on a BGR frame
+    # Backend-agnostic replacement for mp.solutions.drawing_utils
+    h, w = frame.shape[:2]
+    points = {
+        i: (int(lm.x * w), int(lm.y * h))
+        for i, lm in enumerate(landmarks)
+        if lm.visibility >= minVis
+    }
+    for start, end in POSE_CONNECTIONS:
+        if start in points and end in points:
+            cv2.line(frame, points[start], points[end], (0, 0, 255), 2)
+    for point in points.values():
+        cv2.circle(frame, point, 2, (0, 255, 0), 2)
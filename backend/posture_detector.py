@@ -1,4 +1,4 @@
-"""Posture detection utilities built on top of MediaPipe Pose.
+"""Posture detection utilities built on top of the pose backends.
 
 The module can be imported by the main loop or executed directly for a
 webcam demo. `PostureDetector` converts pose landmarks into smoothed posture
@@ -13,8 +13,9 @@ import math
 from typing import Deque, Iterable, Optional
 
 import cv2
-import mediapipe as mp
-from mediapipe.framework.formats import landmark_pb2
+
+from backend import pose_utils
+from backend.pose_backends import Landmark, create_backend
 
 
 @dataclass
@@ -41,18 +42,18 @@ class PostureDetector:
         self.bad_frames = 0
 
     def analyze(
-        self, landmarks: Iterable[landmark_pb2.NormalizedLandmark]
+        self, landmarks: Iterable[Landmark]
     ) -> Optional[PostureResult]:
         """Return posture metrics for the current frame."""
 
         try:
             lm = list(landmarks)
-            left_shoulder = lm[mp.solutions.pose.PoseLandmark.LEFT_SHOULDER]
-            right_shoulder = lm[mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER]
-            left_hip = lm[mp.solutions.pose.PoseLandmark.LEFT_HIP]
-            right_hip = lm[mp.solutions.pose.PoseLandmark.RIGHT_HIP]
-            left_ear = lm[mp.solutions.pose.PoseLandmark.LEFT_EAR]
-            right_ear = lm[mp.solutions.pose.PoseLandmark.RIGHT_EAR]
+            left_shoulder = lm[pose_utils.LEFT_SHOULDER]
+            right_shoulder = lm[pose_utils.RIGHT_SHOULDER]
+            left_hip = lm[pose_utils.LEFT_HIP]
+            right_hip = lm[pose_utils.RIGHT_HIP]
+            left_ear = lm[pose_utils.LEFT_EAR]
+            right_ear = lm[pose_utils.RIGHT_EAR]
         except IndexError:
             return None
 
@@ -90,7 +91,7 @@ class PostureDetector:
         )
 
     def score_only(
-        self, landmarks: Iterable[landmark_pb2.NormalizedLandmark]
+        self, landmarks: Iterable[Landmark]
     ) -> Optional[float]:
         """Convenience helper that returns just the smoothed posture score."""
 
@@ -124,12 +125,12 @@ class PostureDetector:
         )
 
 
-def _midpoint(a: landmark_pb2.NormalizedLandmark, b: landmark_pb2.NormalizedLandmark):
+def _midpoint(a: Landmark, b: Landmark):
     return ((a.x + b.x) / 2, (a.y + b.y) / 2)
 
 
 def _choose_visible(
-    a: landmark_pb2.NormalizedLandmark, b: landmark_pb2.NormalizedLandmark
+    a: Landmark, b: Landmark
 ):
     if a.visibility >= 0.5 and b.visibility >= 0.5:
         return _midpoint(a, b)
@@ -155,8 +156,6 @@ def main() -> None:
     """Simple webcam demo for the posture detector."""
 
     detector = PostureDetector()
-    mp_pose = mp.solutions.pose
-    drawing_utils = mp.solutions.drawing_utils
     
     SHOW_LANDMARKS = False
 
@@ -164,11 +163,8 @@ def main() -> None:
     if not cap.isOpened():
         raise RuntimeError("Unable to access webcam")
 
-    with mp_pose.Pose(
-        static_image_mode=False,
-        model_complexity=1,
-        smooth_landmarks=True,
-        enable_segmentation=False,
+    # Backend is chosen by $POSE_BACKEND (see pose_backends)
+    with create_backend(
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5,
     ) as pose:
@@ -179,23 +175,13 @@ def main() -> None:
 
             rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             rgb.flags.writeable = False
-            results = pose.process(rgb)
+            landmarks = pose.process(rgb)
             rgb.flags.writeable = True
 
-            if results.pose_landmarks:
+            if landmarks:
                 if SHOW_LANDMARKS:
-                    drawing_utils.draw_landmarks(
-                        frame,
-                        results.pose_landmarks,
-                        mp_pose.POSE_CONNECTIONS,
-                        drawing_utils.DrawingSpec(
-                            color=(0, 255, 0), thickness=3, circle_radius=4
-                        ),
-                        drawing_utils.DrawingSpec(
-                            color=(0, 0, 255), thickness=3, circle_radius=2
-                        ),
-                    )
-                posture = detector.analyze(results.pose_landmarks.landmark)
+                    pose_utils.draw_landmarks(frame, landmarks)
+                posture = detector.analyze(landmarks)
                 if posture:
                     detector.annotate(frame, posture)
 
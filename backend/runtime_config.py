@@ -0,0 +1,128 @@
+"""Thread and CPU budget for OpenCV, the pose backends and the servers.
+
+OpenCV, MediaPipe/TFLite (XNNPACK), onnxruntime and uvicorn's thread pool
+each size themselves to the whole machine by default, which oversubscribes
+shared hosts. `RuntimeConfig` is the one place these knobs live; it is read
+from the environment so both servers and the CLI tools pick it up:
+
+- ``POSE_CV_THREADS``: ``cv2.setNumThreads``
+- ``POSE_INFERENCE_THREADS``: intra-op threads for backends that expose it
+  (onnx); MediaPipe has no such knob, so bound it with the CPU set below
+- ``POSE_SERVER_THREADS``: worker threads for sync FastAPI endpoints in
+  `session_state`; the session loop runs on its own thread and doesn't
+  count against it. `server.py` has only async endpoints and sizes its
+  ingest workers from the inference budget instead (`inference_slots`)
+- ``POSE_CAPTURE_CPUS`` / ``POSE_INFERENCE_CPUS`` / ``POSE_ENCODE_CPUS``:
+  CPU lists such as ``0`` or ``1-3,6`` for the capture, inference and JPEG
+  encoding workers (Linux only)
+
+Threads inherit the affinity of the thread that creates them, so pose
+backends are created on the pinned inference worker and their internal
+thread pools stay on those cores.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import os
+from typing import FrozenSet, Optional
+
+import cv2
+
+
+def parse_cpu_list(spec: Optional[str]) -> Optional[FrozenSet[int]]:
+    """Parse ``"0,2-3"`` into ``{0, 2, 3}``; empty or missing means no pinning."""
+
+    if not spec or not spec.strip():
+        return None
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.update(range(int(start), int(end) + 1))
+        elif part:
+            cpus.add(int(part))
+    return frozenset(cpus)
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else None
+
+
+def pin_current_thread(cpus: Optional[FrozenSet[int]]) -> None:
+    """Restrict the calling thread (not the whole process) to `cpus`."""
+
+    if cpus and hasattr(os, "sched_setaffinity"):
+        # On Linux pid 0 means the calling thread
+        os.sched_setaffinity(0, cpus)
+
+
+def pinned_executor(cpus: Optional[FrozenSet[int]], name: str) -> ThreadPoolExecutor:
+    """Single-thread executor whose worker is pinned to `cpus`."""
+
+    return ThreadPoolExecutor(
+        max_workers=1,
+        thread_name_prefix=name,
+        initializer=pin_current_thread,
+        initargs=(cpus,),
+    )
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    cv_threads: Optional[int] = None
+    inference_threads: Optional[int] = None
+    server_threads: Optional[int] = None
+    capture_cpus: Optional[FrozenSet[int]] = None
+    inference_cpus: Optional[FrozenSet[int]] = None
+    encode_cpus: Optional[FrozenSet[int]] = None
+
+    @classmethod
+    def from_env(cls) -> "RuntimeConfig":
+        return cls(
+            cv_threads=_env_int("POSE_CV_THREADS"),
+            inference_threads=_env_int("POSE_INFERENCE_THREADS"),
+            server_threads=_env_int("POSE_SERVER_THREADS"),
+            capture_cpus=parse_cpu_list(os.environ.get("POSE_CAPTURE_CPUS")),
+            inference_cpus=parse_cpu_list(os.environ.get("POSE_INFERENCE_CPUS")),
+            encode_cpus=parse_cpu_list(os.environ.get("POSE_ENCODE_CPUS")),
+        )
+
+    def apply(self) -> None:
+        """Apply the process-wide settings (currently OpenCV's thread pool)."""
+
+        if self.cv_threads is not None:
+            cv2.setNumThreads(self.cv_threads)
+
+    def backend_options(self) -> dict:
+        """Extra keyword arguments for `create_backend`."""
+
+        if self.inference_threads is None:
+            return {}
+        return {"num_threads": self.inference_threads}
+
+    def inference_slots(self) -> int:
+        """How many inferences fit side by side in the inference budget."""
+
+        cpus = len(self.inference_cpus) if self.inference_cpus else (os.cpu_count() or 1)
+        return max(1, cpus // (self.inference_threads or 1))
+
+    def install_server_threads(self, app) -> None:
+        """Size the thread pool FastAPI uses for sync endpoints.
+
+        Anything long-running (like `session_loop`) must not go through this
+        pool, or a budget of 1 leaves no thread for the other endpoints.
+        """
+
+        if self.server_threads is None:
+            return
+
+        async def limit_threads():
+            import anyio.to_thread
+
+            anyio.to_thread.current_default_thread_limiter().total_tokens = self.server_threads
+
+        app.router.on_startup.append(limit_threads)
@@ -1,15 +1,22 @@
 """Minimal FastAPI server to stream MediaPipe landmarks and expose session controls."""
 from typing import Optional
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import dataclasses
+import json
+import os
+import time
 
 import cv2
-from fastapi import FastAPI
+import numpy as np
+from fastapi import FastAPI, WebSocket
 from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 from backend.pose_pipeline import PosePipeline
 from backend.exercise_counter import SquatCounter
+from backend.runtime_config import RuntimeConfig, pin_current_thread, pinned_executor
 
 
 class SessionParams(BaseModel):
@@ -28,6 +35,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# POSE_SERVER_THREADS doesn't apply here: every endpoint is async and the
+# blocking work goes to the executors below
+runtime = RuntimeConfig.from_env()
+# JPEG encoding for the preview stream runs here instead of on the event loop
+encode_executor = pinned_executor(runtime.encode_cpus, "jpeg-encode")
+
 pipeline: Optional[PosePipeline] = None
 counter: Optional[SquatCounter] = None
 running = False
@@ -36,6 +49,30 @@ posture_score = 0.0
 reps = 0
 smoothed_posture = 0.0
 
+# Browser frame ingest limits (see /session/ingest)
+INGEST_MAX_FPS = float(os.environ.get("INGEST_MAX_FPS", "15"))
+# Frames a client may send early (jitter) and still stay within INGEST_MAX_FPS
+INGEST_BURST = 2.0
+# Sockets served at once; each one holds its own pose model
+INGEST_MAX_CLIENTS = int(os.environ.get("INGEST_MAX_CLIENTS", "4"))
+INGEST_FRAME_WIDTH = 640
+INGEST_FRAME_HEIGHT = 360
+# Largest frame (in pixels) a client may send, JPEG or RGBA
+INGEST_MAX_PIXELS = int(os.environ.get("INGEST_MAX_PIXELS", 3840 * 2160))
+# Inferences allowed to run at once across all ingest clients, by default
+# as many as the inference CPU/thread budget holds
+INGEST_MAX_INFLIGHT = int(os.environ.get("INGEST_MAX_INFLIGHT", runtime.inference_slots()))
+ingest_slots = asyncio.Semaphore(INGEST_MAX_INFLIGHT)
+# All ingest pipelines are built, run and closed on these pinned workers, so
+# extra sockets add models but never extra inference threads
+ingest_executor = ThreadPoolExecutor(
+    max_workers=INGEST_MAX_INFLIGHT,
+    thread_name_prefix="ingest",
+    initializer=pin_current_thread,
+    initargs=(runtime.inference_cpus,),
+)
+ingest_clients = 0
+
 
 def compute_posture_score(landmarks) -> float:
     """
@@ -151,7 +188,9 @@ async def frame_generator():
                 reps = exercise_result.reps
             except Exception:
                 pass
-        ret, encoded = cv2.imencode(".jpg", frame, encode_params)
+        ret, encoded = await asyncio.get_running_loop().run_in_executor(
+            encode_executor, cv2.imencode, ".jpg", frame, encode_params
+        )
         if not ret:
             await asyncio.sleep(0)
             continue
@@ -170,3 +209,223 @@ async def session_preview():
         running = True
         mode = "break"
     return StreamingResponse(frame_generator(), media_type="multipart/x-mixed-replace; boundary=frame")
+
+
+def parse_ingest_format(text: str) -> Optional[dict]:
+    """
+    Validate a format text message, e.g. {"format": "rgba", "width": 320, "height": 180}.
+    Returns None if it isn't an object with positive integer dimensions within
+    INGEST_MAX_PIXELS.
+    """
+    try:
+        fmt = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(fmt, dict) or fmt.get("format", "jpeg") not in ("jpeg", "rgba"):
+        return None
+    width, height = fmt.get("width"), fmt.get("height")
+    for value in (width, height):
+        if type(value) is not int or value <= 0:
+            return None
+    if width * height > INGEST_MAX_PIXELS:
+        return None
+    return {"format": fmt.get("format", "jpeg"), "width": width, "height": height}
+
+
+# JPEG start-of-frame markers (baseline, progressive, lossless, ...); C4/C8/CC aren't frames
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_dimensions(data: bytes) -> Optional[tuple]:
+    """Read (width, height) from a JPEG's SOF header without decoding it."""
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Markers without a length field
+            i += 2
+            continue
+        if marker == 0xDA:
+            # Scan data started before any frame header
+            return None
+        if marker in _JPEG_SOF:
+            if i + 9 > len(data):
+                return None
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            return width, height
+        i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+
+def decode_ingest_frame(data: bytes, fmt: dict) -> Optional[np.ndarray]:
+    """
+    Decode one binary ingest message to BGR. JPEG payloads are detected by
+    their SOI marker and sized from their own header; anything else must be
+    raw RGBA of the announced size.
+    """
+    if data[:2] == b"\xff\xd8":
+        size = jpeg_dimensions(data)
+        if size is None or size[0] * size[1] > INGEST_MAX_PIXELS:
+            return None
+        # Let libjpeg downscale while decoding, as far as the pipeline size allows
+        flag = cv2.IMREAD_COLOR
+        for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8),
+                                (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                (2, cv2.IMREAD_REDUCED_COLOR_2)):
+            if size[0] // factor >= INGEST_FRAME_WIDTH and size[1] // factor >= INGEST_FRAME_HEIGHT:
+                flag = reduced
+                break
+        return cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+
+    width, height = fmt.get("width", 0), fmt.get("height", 0)
+    if width <= 0 or height <= 0 or len(data) != width * height * 4:
+        return None
+    rgba = np.frombuffer(data, np.uint8).reshape(height, width, 4)
+    return cv2.cvtColor(rgba, cv2.COLOR_RGBA2BGR)
+
+
+class IngestClient:
+    """Per-socket pose pipeline, counters and the latest pending frame."""
+
+    def __init__(self):
+        self.pipeline = PosePipeline(
+            camera_index=None,
+            frame_width=INGEST_FRAME_WIDTH,
+            frame_height=INGEST_FRAME_HEIGHT,
+            draw_landmarks=False,
+            # Already on a pinned ingest worker; no per-client executors
+            runtime=dataclasses.replace(runtime, capture_cpus=None, inference_cpus=None),
+        )
+        self.counter = SquatCounter()
+        self.smoothed_posture = 0.0
+        self.format: dict = {}
+        self.pending: Optional[tuple] = None  # (seq, payload, received_at)
+        self.frame_ready = asyncio.Event()
+        # analyze() running on a worker thread, if any
+        self.inflight: Optional[asyncio.Future] = None
+        self.seq = 0
+        self.dropped = 0
+        # Token bucket: refills at INGEST_MAX_FPS, holds up to INGEST_BURST frames
+        self.allowance = 1.0
+        self.last_offer = time.monotonic()
+
+    def offer(self, data: bytes) -> None:
+        """Queue a frame, dropping it or the older pending one when over budget."""
+        now = time.monotonic()
+        self.seq += 1
+        self.allowance = min(INGEST_BURST, self.allowance + (now - self.last_offer) * INGEST_MAX_FPS)
+        self.last_offer = now
+        if self.allowance < 1.0:
+            self.dropped += 1
+            return
+        self.allowance -= 1.0
+        if self.pending is not None:
+            # Inference hasn't caught up; the newer frame replaces the stale one
+            self.dropped += 1
+        self.pending = (self.seq, data, now)
+        self.frame_ready.set()
+
+    def analyze(self, data: bytes) -> Optional[dict]:
+        frame = decode_ingest_frame(data, self.format)
+        if frame is None:
+            return None
+        _, landmarks = self.pipeline.process(frame)
+        result = {"reps": self.counter.rep_count, "posture_score": self.smoothed_posture,
+                  "landmarks": None}
+        if landmarks:
+            raw_score = compute_posture_score(landmarks)
+            self.smoothed_posture = 0.8 * self.smoothed_posture + 0.2 * raw_score
+            result["posture_score"] = self.smoothed_posture
+            result["reps"] = self.counter.update(landmarks).reps
+            result["landmarks"] = [
+                [round(lm.x, 4), round(lm.y, 4), round(lm.z, 4), round(lm.visibility, 3)]
+                for lm in landmarks
+            ]
+        return result
+
+
+async def _ingest_receiver(websocket: WebSocket, client: IngestClient):
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        if message.get("bytes") is not None:
+            client.offer(message["bytes"])
+        elif message.get("text"):
+            # Text messages configure the stream, e.g. {"format": "rgba", "width": 320, "height": 180}
+            fmt = parse_ingest_format(message["text"])
+            if fmt is None:
+                await websocket.send_json({"error": "invalid format message"})
+            else:
+                client.format = fmt
+
+
+async def _ingest_processor(websocket: WebSocket, client: IngestClient):
+    while True:
+        await client.frame_ready.wait()
+        client.frame_ready.clear()
+        if client.pending is None:
+            continue
+        async with ingest_slots:
+            seq, data, received_at = client.pending
+            client.pending = None
+            client.inflight = asyncio.get_running_loop().run_in_executor(
+                ingest_executor, client.analyze, data
+            )
+            try:
+                result = await asyncio.shield(client.inflight)
+            except asyncio.CancelledError:
+                # The thread can't be interrupted; keep the slot until it finishes
+                await asyncio.wait({client.inflight})
+                raise
+        if result is None:
+            await websocket.send_json({"seq": seq, "error": "undecodable frame"})
+            continue
+        result["seq"] = seq
+        result["dropped"] = client.dropped
+        result["latency_ms"] = round((time.monotonic() - received_at) * 1000, 1)
+        await websocket.send_json(result)
+
+
+async def _close_ingest(client: IngestClient, *tasks: asyncio.Task):
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # Never close the pipeline under a running analyze()
+    if client.inflight is not None:
+        await asyncio.wait({client.inflight})
+    await asyncio.get_running_loop().run_in_executor(ingest_executor, client.pipeline.release)
+
+
+@app.websocket("/session/ingest")
+async def session_ingest(websocket: WebSocket):
+    """
+    Analyze frames from a remote browser camera. Clients send binary JPEG
+    (or raw RGBA after a format text message) and get one JSON result per
+    analyzed frame back on the same socket.
+    """
+    global ingest_clients
+    if ingest_clients >= INGEST_MAX_CLIENTS:
+        # Closing before accept rejects the handshake (HTTP 403)
+        await websocket.close(code=1013)
+        return
+    ingest_clients += 1
+    try:
+        await websocket.accept()
+        client = await asyncio.get_running_loop().run_in_executor(ingest_executor, IngestClient)
+        receiver = asyncio.create_task(_ingest_receiver(websocket, client))
+        processor = asyncio.create_task(_ingest_processor(websocket, client))
+        try:
+            await asyncio.wait({receiver, processor}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            receiver.cancel()
+            processor.cancel()
+            # Shielded so the pipeline is still released if this handler gets cancelled
+            await asyncio.shield(_close_ingest(client, receiver, processor))
+    finally:
+        ingest_clients -= 1
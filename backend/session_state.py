@@ -1,7 +1,10 @@
 # Session state management
+import threading
 import time
+from typing import Optional
+
 import cv2
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from pydantic import BaseModel
@@ -9,6 +12,7 @@ from pydantic import BaseModel
 from backend.exercise_counter import SquatCounter
 from backend.pose_pipeline import PosePipeline
 from backend.posture_detector import PostureDetector
+from backend.runtime_config import RuntimeConfig
 
 SHOW_PREVIEW = False
 
@@ -25,6 +29,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Caps the threadpool for the sync endpoints; session_loop gets its own
+# thread so a small pool can't starve /session/status and /session/stop
+RuntimeConfig.from_env().install_server_threads(app)
 
 
 class SessionConfig(BaseModel):
@@ -48,8 +55,10 @@ def _next_mode(current: str) -> str:
     return "break" if current == "focus" else "focus"
 
 
-def session_loop(config: SessionConfig):
-    if session_state.running:
+def session_loop(config: SessionConfig, state: Optional[SessionState] = None):
+    # state lets another process (camera_owner) drive its own SessionState
+    state = state or session_state
+    if state.running:
         return
 
     pipeline = PosePipeline()
@@ -62,17 +71,17 @@ def session_loop(config: SessionConfig):
     duration = focus_time
     next_switch = time.monotonic() + duration
 
-    session_state.running = True
-    session_state.mode = mode
-    session_state.remaining = duration
-    session_state.reps = 0
-    session_state.posture_score = 0.0
+    state.running = True
+    state.mode = mode
+    state.remaining = duration
+    state.reps = 0
+    state.posture_score = 0.0
 
     try:
-        while session_state.running:
+        while state.running:
             now = time.monotonic()
             remaining = max(int(next_switch - now), 0)
-            session_state.remaining = remaining
+            state.remaining = remaining
 
             frame, landmarks = pipeline.read()
             if frame is None:
@@ -81,37 +90,39 @@ def session_loop(config: SessionConfig):
             if SHOW_PREVIEW:
                 cv2.imshow("Session Preview", frame)
                 if cv2.waitKey(1) & 0xFF == ord("q"):
-                    session_state.running = False
+                    state.running = False
                     break
 
             if landmarks is not None:
                 result = counter.update(landmarks)
-                session_state.reps = result.reps
+                state.reps = result.reps
 
                 posture_result = detector.analyze(landmarks)
                 if posture_result is not None:
-                    session_state.posture_score = posture_result.score
+                    state.posture_score = posture_result.score
 
             if remaining <= 0:
                 mode = _next_mode(mode)
                 duration = break_time if mode == "break" else focus_time
                 next_switch = time.monotonic() + duration
-                session_state.mode = mode
-                session_state.remaining = duration
+                state.mode = mode
+                state.remaining = duration
 
             time.sleep(0.05)
     finally:
-        session_state.running = False
-        session_state.mode = "idle"
-        session_state.remaining = 0
+        state.running = False
+        state.mode = "idle"
+        state.remaining = 0
         pipeline.release()
         if SHOW_PREVIEW:
             cv2.destroyWindow("Session Preview")
 
 
 @app.post("/session/start")
-def start_session(config: SessionConfig, tasks: BackgroundTasks):
-    tasks.add_task(session_loop, config)
+def start_session(config: SessionConfig):
+    threading.Thread(
+        target=session_loop, args=(config,), name="session-loop", daemon=True
+    ).start()
     return {"status": "starting"}
 
 
@@ -0,0 +1,126 @@
+"""Multi-worker session API backed by the shared status snapshot.
+
+One camera-owner process runs the pose pipeline and counters; any number of
+stateless uvicorn workers answer `/session/status` straight from shared
+memory and forward start/stop requests to the owner. The endpoints match
+`session_state.py`, so the frontend doesn't need to change.
+
+    python -m backend.status_server --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import time
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from backend.camera_owner import PUBLISH_INTERVAL, owner_process
+from backend.session_state import SessionConfig
+from backend.status_snapshot import COMMAND_START, COMMAND_STOP, SharedStatus
+
+
+STATUS_SHM_ENV = "POSE_STATUS_SHM"
+# A snapshot this old means the camera owner has stopped publishing
+STALE_AFTER = 10 * PUBLISH_INTERVAL
+
+app = FastAPI()
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[
+        "http://localhost:5173",
+        "http://127.0.0.1:5173",
+        "http://localhost:4173",
+        "http://127.0.0.1:4173",
+    ],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+_status: Optional[SharedStatus] = None
+
+
+def shared_status() -> SharedStatus:
+    """Attach to the owner's status block on first use in this worker."""
+    global _status
+    if _status is None:
+        _status = SharedStatus(os.environ[STATUS_SHM_ENV])
+    return _status
+
+
+@app.post("/session/start")
+def start_session(config: SessionConfig):
+    shared_status().send_command(COMMAND_START, config.focus_seconds, config.break_seconds)
+    return {"status": "starting"}
+
+
+@app.get("/session/status")
+async def get_status():
+    # Lock-free shared-memory read, no need for the threadpool
+    snapshot = shared_status().read()
+    if time.time() - snapshot.updated_at > STALE_AFTER:
+        # Owner is gone or hung; don't keep reporting its last session as live
+        return {
+            "mode": "idle",
+            "remaining_seconds": 0,
+            "reps": snapshot.reps,
+            "posture_score": snapshot.posture_score,
+            "running": False,
+            "stale": True,
+        }
+    return {
+        "mode": snapshot.mode,
+        "remaining_seconds": snapshot.remaining_seconds,
+        "reps": snapshot.reps,
+        "posture_score": snapshot.posture_score,
+        "running": snapshot.running,
+        "stale": False,
+    }
+
+
+@app.post("/session/stop")
+def stop_session():
+    shared_status().send_command(COMMAND_STOP)
+    return {"status": "stopping"}
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    status = SharedStatus(create=True)
+    os.environ[STATUS_SHM_ENV] = status.name
+
+    ctx = mp.get_context("spawn")
+    stop_event = ctx.Event()
+    owner = ctx.Process(
+        target=owner_process, args=(status.name, stop_event), name="camera-owner"
+    )
+    owner.start()
+    try:
+        uvicorn.run(
+            "backend.status_server:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+        )
+    finally:
+        stop_event.set()
+        owner.join(timeout=10.0)
+        if owner.is_alive():
+            owner.terminate()
+        status.close()
+
+
+if __name__ == "__main__":
+    main()
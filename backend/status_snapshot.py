@@ -0,0 +1,230 @@
+"""Session status shared between processes through one shared-memory block.
+
+The camera-owner process is the only writer of the status record and
+publishes it with a seqlock: it bumps a sequence number to odd, writes the
+payload and its CRC32, then bumps it back to even. Readers (any number of
+HTTP workers) copy the payload between two reads of the sequence and retry
+if it was odd or changed, or if the checksum doesn't match, so reads never
+take a lock and never block the writer. The checksum keeps torn reads out
+even where the CPU may reorder the stores (non-x86 hosts).
+
+Start/stop requests go the other way through a small ring of command slots.
+Several workers may write it, so writers serialize on a file lock; each
+command gets the next sequence number, and the owner reads every slot it
+hasn't seen yet, in order. Only if more than `COMMAND_SLOTS` commands
+arrive between two polls are the oldest ones lost.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+import os
+import struct
+import tempfile
+import time
+from typing import List, Optional, Tuple
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+MODES = ("idle", "focus", "break")
+
+_SEQ = struct.Struct("<Q")
+_CRC = struct.Struct("<I")
+# reps, posture_score, remaining_seconds, mode index, running, updated_at
+_STATUS = struct.Struct("<qdiiBd")
+# seq, command id, focus_seconds, break_seconds
+_COMMAND = struct.Struct("<Qiii")
+
+_STATUS_SEQ_OFFSET = 0
+_STATUS_OFFSET = _SEQ.size
+# Keep the command ring on its own cache line
+_COMMAND_COUNT_OFFSET = 64
+_COMMAND_RING_OFFSET = _COMMAND_COUNT_OFFSET + _SEQ.size
+_COMMAND_SLOT_SIZE = _COMMAND.size + _CRC.size
+COMMAND_SLOTS = 8
+SIZE = _COMMAND_RING_OFFSET + COMMAND_SLOTS * _COMMAND_SLOT_SIZE
+
+COMMAND_START = 1
+COMMAND_STOP = 2
+
+
+@dataclass
+class StatusSnapshot:
+    mode: str = "idle"
+    remaining_seconds: int = 0
+    reps: int = 0
+    posture_score: float = 0.0
+    running: bool = False
+    updated_at: float = 0.0
+
+
+@dataclass
+class Command:
+    seq: int
+    command: int
+    focus_seconds: int
+    break_seconds: int
+
+
+class SharedStatus:
+    """Attach to (or create) the shared status block called `name`."""
+
+    def __init__(self, name: Optional[str] = None, create: bool = False) -> None:
+        self.owner = create
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=SIZE)
+            self.shm.buf[:SIZE] = bytes(SIZE)
+        else:
+            self.shm = _attach(name)
+        self.buf = self.shm.buf
+        if create:
+            # A valid idle record, so readers never see a bad checksum
+            self._pack_checked(_STATUS, _STATUS_OFFSET, 0, 0.0, 0, 0, 0, 0.0)
+        self._lock_path = os.path.join(tempfile.gettempdir(), f"{self.shm.name.lstrip('/')}.lock")
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _seq(self, offset: int) -> int:
+        return _SEQ.unpack_from(self.buf, offset)[0]
+
+    def _pack_checked(self, payload: struct.Struct, offset: int, *values) -> None:
+        raw = payload.pack(*values)
+        self.buf[offset:offset + len(raw)] = raw
+        _CRC.pack_into(self.buf, offset + len(raw), zlib.crc32(raw))
+
+    def _unpack_checked(self, payload: struct.Struct, offset: int):
+        """Payload values, or None if they don't match their checksum."""
+
+        raw = bytes(self.buf[offset:offset + payload.size])
+        if _CRC.unpack_from(self.buf, offset + payload.size)[0] != zlib.crc32(raw):
+            return None
+        return payload.unpack(raw)
+
+    def _read_consistent(self, retries: int):
+        for _ in range(retries):
+            before = self._seq(_STATUS_SEQ_OFFSET)
+            if before & 1:
+                continue
+            values = self._unpack_checked(_STATUS, _STATUS_OFFSET)
+            if values is not None and self._seq(_STATUS_SEQ_OFFSET) == before:
+                return values
+        raise TimeoutError("shared status kept changing while being read")
+
+    def publish(self, state) -> None:
+        """Write the status record (camera owner only)."""
+
+        seq = self._seq(_STATUS_SEQ_OFFSET)
+        _SEQ.pack_into(self.buf, _STATUS_SEQ_OFFSET, seq + 1)
+        self._pack_checked(
+            _STATUS,
+            _STATUS_OFFSET,
+            int(state.reps),
+            float(state.posture_score),
+            int(state.remaining),
+            MODES.index(state.mode) if state.mode in MODES else 0,
+            1 if state.running else 0,
+            time.time(),
+        )
+        _SEQ.pack_into(self.buf, _STATUS_SEQ_OFFSET, seq + 2)
+
+    def read(self, retries: int = 10000) -> StatusSnapshot:
+        """Lock-free read of the latest status record."""
+
+        reps, score, remaining, mode, running, updated_at = self._read_consistent(retries)
+        return StatusSnapshot(
+            mode=MODES[mode] if mode < len(MODES) else "idle",
+            remaining_seconds=remaining,
+            reps=reps,
+            posture_score=score,
+            running=bool(running),
+            updated_at=updated_at,
+        )
+
+    @staticmethod
+    def _slot_offset(seq: int) -> int:
+        return _COMMAND_RING_OFFSET + ((seq - 1) % COMMAND_SLOTS) * _COMMAND_SLOT_SIZE
+
+    def send_command(self, command: int, focus_seconds: int = 0, break_seconds: int = 0) -> None:
+        """Queue a start/stop request for the camera owner (any process)."""
+
+        with _file_lock(self._lock_path):
+            seq = self._seq(_COMMAND_COUNT_OFFSET) + 1
+            self._pack_checked(
+                _COMMAND, self._slot_offset(seq), seq, command, focus_seconds, break_seconds
+            )
+            # Publish the slot only once it is written
+            _SEQ.pack_into(self.buf, _COMMAND_COUNT_OFFSET, seq)
+
+    def poll_commands(self, last_seq: int, retries: int = 1000) -> Tuple[int, List[Command]]:
+        """Commands sent after `last_seq`, oldest first, and the new last seq."""
+
+        newest = self._seq(_COMMAND_COUNT_OFFSET)
+        commands = []
+        # Anything older than the ring has already been overwritten
+        for seq in range(max(last_seq + 1, newest - COMMAND_SLOTS + 1), newest + 1):
+            for _ in range(retries):
+                values = self._unpack_checked(_COMMAND, self._slot_offset(seq))
+                if values is not None and values[0] == seq:
+                    commands.append(Command(*values))
+                    break
+                if values is not None and values[0] > seq:
+                    # Overwritten by a newer command while we were behind
+                    break
+        return newest, commands
+
+    def close(self) -> None:
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+            try:
+                os.unlink(self._lock_path)
+            except FileNotFoundError:
+                pass
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Only the creator should unlink the block. Python 3.13+ can skip the
+    # resource tracker for attachers; older versions register it again, which
+    # is harmless as long as the workers share the launcher's tracker
+    # (true for processes started by status_server.main).
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock on `path` across processes."""
+
+    with open(path, "a+b") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        else:
+            lock.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10 s; keep waiting
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
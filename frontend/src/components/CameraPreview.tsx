@@ -1,5 +1,6 @@
 import { useEffect, useMemo, useRef, useState } from "react";
 import { Card } from "./ui/card";
+import { connectFrameIngest, type IngestResult } from "../lib/ingest";
 
 interface CameraPreviewProps {
   active: boolean;
@@ -12,6 +13,7 @@ export const CameraPreview = ({ active, title = "Live Preview", streamUrl }: Cam
   const streamRef = useRef<MediaStream | null>(null);
   const [imgError, setImgError] = useState<string | null>(null);
   const [useLocal, setUseLocal] = useState(false);
+  const [ingestResult, setIngestResult] = useState<IngestResult | null>(null);
 
   const resolvedStreamUrl = useMemo(() => {
     if (streamUrl) return streamUrl;
@@ -24,12 +26,23 @@ export const CameraPreview = ({ active, title = "Live Preview", streamUrl }: Cam
     // If a backend stream URL is provided, don't open the local camera.
     if (resolvedStreamUrl && !useLocal) return;
 
+    let stopIngest: (() => void) | null = null;
+    let cancelled = false;
+
     const startStream = async () => {
       try {
         const stream = await navigator.mediaDevices.getUserMedia({ video: true, audio: false });
+        if (cancelled) {
+          stream.getTracks().forEach((t) => t.stop());
+          return;
+        }
         streamRef.current = stream;
         if (videoRef.current) {
           videoRef.current.srcObject = stream;
+          // The backend can't see this camera, so send it frames to analyze
+          stopIngest = connectFrameIngest(videoRef.current, (result) => {
+            if (!result.error) setIngestResult(result);
+          });
         }
       } catch (err) {
         console.error("Unable to access camera:", err);
@@ -47,6 +60,9 @@ export const CameraPreview = ({ active, title = "Live Preview", streamUrl }: Cam
     }
 
     return () => {
+      cancelled = true;
+      stopIngest?.();
+      setIngestResult(null);
       if (streamRef.current) {
         streamRef.current.getTracks().forEach((t) => t.stop());
       }
@@ -110,7 +126,11 @@ export const CameraPreview = ({ active, title = "Live Preview", streamUrl }: Cam
         )}
       </div>
       <p className="muted small" style={{ margin: 0 }}>
-        {imgError
+        {ingestResult
+          ? `Local camera, analyzed by backend: ${ingestResult.reps} reps, posture ${Math.round(
+              ingestResult.posture_score,
+            )}/100`
+          : imgError
           ? imgError
           : resolvedStreamUrl
           ? "Preview from backend (with landmarks)"
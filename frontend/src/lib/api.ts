@@ -23,7 +23,7 @@ export interface SessionConfig {
   mode?: string;
 }
 
-const API_BASE =
+export const API_BASE =
   import.meta.env.VITE_API_BASE_URL ??
   `${window.location.protocol}//${window.location.hostname}:8000`;
 
@@ -0,0 +1,72 @@
+import { API_BASE } from "./api";
+
+export interface IngestResult {
+  seq: number;
+  reps: number;
+  posture_score: number;
+  landmarks: [number, number, number, number][] | null;
+  dropped: number;
+  latency_ms: number;
+  error?: string;
+}
+
+export interface IngestOptions {
+  fps?: number;
+  width?: number;
+  quality?: number;
+}
+
+// Same host as the REST API, over ws:// or wss://
+const INGEST_URL = `${API_BASE.replace(/^http/, "ws")}/session/ingest`;
+
+/**
+ * Streams downscaled JPEG frames from a <video> element to the backend for
+ * pose analysis. Only one frame is in flight on the socket at a time, so a
+ * slow network or server makes us skip frames instead of queueing them.
+ * Returns a function that stops streaming and closes the socket.
+ */
+export const connectFrameIngest = (
+  video: HTMLVideoElement,
+  onResult: (result: IngestResult) => void,
+  { fps = 10, width = 320, quality = 0.7 }: IngestOptions = {},
+) => {
+  const socket = new WebSocket(INGEST_URL);
+  socket.binaryType = "arraybuffer";
+  const canvas = document.createElement("canvas");
+  const context = canvas.getContext("2d");
+  let encoding = false;
+
+  socket.onmessage = (event) => {
+    if (typeof event.data === "string") {
+      onResult(JSON.parse(event.data) as IngestResult);
+    }
+  };
+
+  const sendFrame = () => {
+    if (!context || encoding || socket.readyState !== WebSocket.OPEN) return;
+    if (socket.bufferedAmount > 0 || video.videoWidth === 0) return;
+
+    canvas.width = width;
+    canvas.height = Math.round((video.videoHeight / video.videoWidth) * width);
+    context.drawImage(video, 0, 0, canvas.width, canvas.height);
+
+    encoding = true;
+    canvas.toBlob(
+      async (blob) => {
+        encoding = false;
+        if (blob && socket.readyState === WebSocket.OPEN) {
+          socket.send(await blob.arrayBuffer());
+        }
+      },
+      "image/jpeg",
+      quality,
+    );
+  };
+
+  const timer = window.setInterval(sendFrame, 1000 / fps);
+
+  return () => {
+    window.clearInterval(timer);
+    socket.close();
+  };
+};
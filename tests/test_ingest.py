@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+import pytest
+
+from backend import server
+from backend.fake_pipeline import FakePosePipeline
+
+
+def _jpeg(width, height):
+    ok, buf = cv2.imencode(".jpg", np.zeros((height, width, 3), np.uint8))
+    assert ok
+    return buf.tobytes()
+
+
+@pytest.mark.parametrize("size", [(640, 360), (1920, 1080), (17, 9)])
+def test_jpeg_dimensions_reads_header(size):
+    assert server.jpeg_dimensions(_jpeg(*size)) == size
+
+
+def test_jpeg_dimensions_rejects_garbage():
+    assert server.jpeg_dimensions(b"\xff\xd8") is None
+    assert server.jpeg_dimensions(b"\xff\xd8\x00\x00\x00\x00") is None
+    # Scan data before any frame header
+    assert server.jpeg_dimensions(b"\xff\xd8\xff\xda\x00\x02") is None
+
+
+@pytest.mark.parametrize("text", [
+    "not json",
+    "[1, 2]",
+    '"rgba"',
+    '{"format": "png", "width": 320, "height": 180}',
+    '{"format": "rgba", "width": "320", "height": 180}',
+    '{"format": "rgba", "width": true, "height": 180}',
+    '{"format": "rgba", "width": 0, "height": 180}',
+    '{"format": "rgba", "width": 100000, "height": 100000}',
+])
+def test_parse_ingest_format_rejects(text):
+    assert server.parse_ingest_format(text) is None
+
+
+def test_parse_ingest_format_accepts():
+    assert server.parse_ingest_format('{"format": "rgba", "width": 320, "height": 180}') == {
+        "format": "rgba", "width": 320, "height": 180,
+    }
+    assert server.parse_ingest_format('{"width": 640, "height": 360}')["format"] == "jpeg"
+
+
+def test_decode_ingest_frame_jpeg_reduces_large_frames():
+    assert server.decode_ingest_frame(_jpeg(640, 360), {}).shape == (360, 640, 3)
+    assert server.decode_ingest_frame(_jpeg(1920, 1080), {}).shape == (540, 960, 3)
+    assert server.decode_ingest_frame(_jpeg(2560, 1440), {}).shape == (360, 640, 3)
+
+
+def test_decode_ingest_frame_rejects_oversized_jpeg(monkeypatch):
+    monkeypatch.setattr(server, "INGEST_MAX_PIXELS", 640 * 360)
+    assert server.decode_ingest_frame(_jpeg(1280, 720), {}) is None
+
+
+def test_decode_ingest_frame_rgba():
+    rgba = np.zeros((2, 3, 4), np.uint8)
+    rgba[..., 0] = 255  # red
+    frame = server.decode_ingest_frame(rgba.tobytes(), {"width": 3, "height": 2})
+    assert frame.shape == (2, 3, 3)
+    assert tuple(frame[0, 0]) == (0, 0, 255)
+    # Wrong length for the announced size
+    assert server.decode_ingest_frame(rgba.tobytes()[:-1], {"width": 3, "height": 2}) is None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server, "PosePipeline", FakePosePipeline)
+    clock = [100.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: clock[0])
+    ingest = server.IngestClient()
+    ingest.clock = clock
+    return ingest
+
+
+def test_offer_keeps_jittered_stream_at_max_fps(client):
+    rng = np.random.default_rng(0)
+    accepted = 0
+    for i in range(150):
+        client.clock[0] = 100.0 + i / server.INGEST_MAX_FPS + rng.uniform(-0.005, 0.005)
+        client.offer(b"frame")
+        if client.pending is not None:
+            accepted += 1
+            client.pending = None
+    assert accepted >= 148
+
+
+def test_offer_drops_frames_over_budget(client):
+    for _ in range(10):
+        client.offer(b"frame")
+    assert client.pending[0] == 1
+    assert client.dropped == 9
+
+
+def test_offer_newer_frame_replaces_pending(client):
+    client.offer(b"old")
+    client.clock[0] += 1.0
+    client.offer(b"new")
+    assert client.pending[:2] == (2, b"new")
+    assert client.dropped == 1
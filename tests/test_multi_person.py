@@ -0,0 +1,124 @@
+import pytest
+
+from backend.multi_person import (
+    PersonTracker,
+    crop_to_frame,
+    iou,
+    keypoints_agree,
+    keypoints_fill,
+)
+from backend.pose_backends import Landmark, PoseBackend
+
+
+class FakeBackend(PoseBackend):
+    created = 0
+
+    def __init__(self):
+        super().__init__()
+        FakeBackend.created += 1
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def tracker():
+    FakeBackend.created = 0
+    return PersonTracker(FakeBackend)
+
+
+def _standing(box, count=10):
+    """Keypoints spread down the middle of `box`, head to feet."""
+    x1, y1, x2, y2 = box
+    step = (y2 - y1) / (count - 1)
+    return [((x1 + x2) / 2, y1 + i * step) for i in range(count)]
+
+
+def test_iou():
+    assert iou((0, 0, 10, 10), (0, 0, 10, 10)) == pytest.approx(1.0)
+    assert iou((0, 0, 10, 10), (20, 20, 30, 30)) == 0.0
+    assert iou((0, 0, 10, 10), (5, 0, 15, 10)) == pytest.approx(50 / 150)
+
+
+def test_crop_to_frame_maps_corners_and_keeps_z_visibility():
+    crop = (100, 50, 300, 350)
+    mapped = crop_to_frame(
+        [Landmark(0.0, 0.0, 0.1, 0.9), Landmark(1.0, 1.0), Landmark(0.5, 0.5)],
+        crop, 640, 360,
+    )
+    assert (mapped[0].x, mapped[0].y) == pytest.approx((100 / 640, 50 / 360))
+    assert (mapped[0].z, mapped[0].visibility) == (0.1, 0.9)
+    assert (mapped[1].x, mapped[1].y) == pytest.approx((300 / 640, 350 / 360))
+    assert (mapped[2].x, mapped[2].y) == pytest.approx((200 / 640, 200 / 360))
+
+
+def test_keypoints_fill_requires_pose_to_span_box():
+    box = (0, 0, 100, 200)
+    assert keypoints_fill(_standing((10, 40, 90, 200)), box)
+    # A small pose tucked inside a big box is someone else's detection
+    assert not keypoints_fill(_standing((40, 20, 60, 80)), box)
+    assert not keypoints_fill(None, box)
+
+
+def test_keypoints_agree():
+    a = _standing((0, 0, 100, 200))
+    assert keypoints_agree(a, [(x + 3, y) for x, y in a], (0, 0, 100, 200))
+    assert not keypoints_agree(a, [(x + 60, y) for x, y in a], (0, 0, 100, 200))
+
+
+def test_update_keeps_ids_stable(tracker):
+    tracker.update([(0, 0, 100, 200), (300, 0, 400, 200)])
+    tracker.update([(5, 0, 105, 200), (305, 0, 405, 200)])
+    assert sorted(tracker.tracks) == [1, 2]
+    assert tracker.tracks[1].box == (5, 0, 105, 200)
+    assert FakeBackend.created == 2
+
+
+def test_overlapping_people_both_tracked(tracker):
+    # Someone partly behind someone else
+    tracker.update([(0, 0, 100, 200), (60, 20, 120, 140)])
+    tracker.suppress_duplicates()
+    assert len(tracker.tracks) == 2
+
+
+def test_shrunken_track_claims_its_detection(tracker):
+    tracker.update([(0, 0, 100, 200)])
+    track = tracker.tracks[1]
+    # Mid squat: the landmark box is well below the IoU threshold
+    track.box = (30, 100, 70, 200)
+    track.keypoints = _standing((30, 100, 70, 200))
+    tracker.update([(0, 0, 100, 200)])
+    assert list(tracker.tracks) == [1]
+    assert track.box == (0, 0, 100, 200)
+    assert FakeBackend.created == 1
+
+
+def test_duplicate_detection_creates_no_backend(tracker):
+    tracker.update([(0, 0, 100, 200)])
+    # A second, near-identical detection matched nothing but is the same person
+    tracker.update([(0, 0, 100, 200), (2, 0, 102, 200)])
+    assert list(tracker.tracks) == [1]
+    assert FakeBackend.created == 1
+
+
+def test_suppress_duplicates_drops_newer_track(tracker):
+    tracker.update([(0, 0, 100, 200), (300, 0, 400, 200)])
+    first, second = tracker.tracks[1], tracker.tracks[2]
+    # Both tracks converged onto the same person
+    second.box = (10, 0, 90, 200)
+    first.keypoints = _standing((0, 0, 100, 200))
+    second.keypoints = _standing((2, 0, 102, 200))
+    tracker.suppress_duplicates()
+    assert list(tracker.tracks) == [1]
+    assert second.backend.closed
+
+
+def test_prune_closes_missing_tracks(tracker):
+    tracker.max_missed = 1
+    tracker.update([(0, 0, 100, 200)])
+    backend = tracker.tracks[1].backend
+    tracker.update([])
+    tracker.update([])
+    assert not tracker.tracks
+    assert backend.closed
@@ -0,0 +1,148 @@
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend import pose_backends
+from backend.pose_backends import (
+    BACKENDS,
+    Landmark,
+    NUM_LANDMARKS,
+    OnnxPoseBackend,
+    PoseBackend,
+    backend_class,
+    create_backend,
+)
+
+
+def test_backend_class_by_name():
+    for name, cls in BACKENDS.items():
+        assert backend_class(name) is cls
+        assert cls.name == name
+
+
+def test_backend_class_defaults_to_env(monkeypatch):
+    monkeypatch.setenv("POSE_BACKEND", "onnx")
+    assert backend_class() is OnnxPoseBackend
+    monkeypatch.delenv("POSE_BACKEND")
+    assert backend_class() is BACKENDS[pose_backends.DEFAULT_BACKEND]
+
+
+def test_backend_class_rejects_unknown_name():
+    with pytest.raises(ValueError, match="Unknown pose backend 'nope'"):
+        backend_class("nope")
+    with pytest.raises(ValueError):
+        create_backend("nope")
+
+
+def test_create_backend_passes_options(monkeypatch):
+    class Recording(PoseBackend):
+        name = "recording"
+
+        def __init__(self, **options):
+            super().__init__()
+            self.options = options
+
+    monkeypatch.setitem(BACKENDS, "recording", Recording)
+    backend = create_backend("recording", num_threads=2)
+    assert isinstance(backend, Recording)
+    assert backend.options == {"num_threads": 2}
+
+
+def test_only_live_stream_is_async():
+    assert [name for name, cls in BACKENDS.items() if cls.is_async] == ["tasks_live"]
+
+
+INPUT_SIZE = 256
+
+
+class FakeSession:
+    """Stands in for onnxruntime.InferenceSession with a 256x256 NHWC input."""
+
+    def __init__(self, *_args, **_kwargs):
+        self.raw = np.zeros((NUM_LANDMARKS, 5), np.float32)
+        self.presence = 1.0
+        self.inputs = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input", shape=[1, INPUT_SIZE, INPUT_SIZE, 3])]
+
+    def run(self, _outputs, feed):
+        self.inputs.append(feed["input"])
+        return [self.raw.reshape(1, -1), np.array([[self.presence]], np.float32)]
+
+
+@pytest.fixture
+def onnx_backend(monkeypatch):
+    fake_ort = SimpleNamespace(
+        SessionOptions=lambda: SimpleNamespace(),
+        InferenceSession=FakeSession,
+    )
+    monkeypatch.setitem(sys.modules, "onnxruntime", fake_ort)
+    return OnnxPoseBackend(model_path="unused.onnx")
+
+
+def test_onnx_roi_letterboxes_whole_frame_without_previous_pose(onnx_backend):
+    assert onnx_backend._roi(640, 360) == (0.0, -140.0, 640.0)
+
+
+def test_onnx_roi_is_square_around_previous_pose(onnx_backend):
+    landmarks = [Landmark(0.0, 0.0, visibility=0.1)] * NUM_LANDMARKS
+    # Visible points spanning 100x200 px around (320, 180) in a 640x360 frame
+    landmarks[:4] = [
+        Landmark(270 / 640, 80 / 360, visibility=0.9),
+        Landmark(370 / 640, 80 / 360, visibility=0.9),
+        Landmark(270 / 640, 280 / 360, visibility=0.9),
+        Landmark(370 / 640, 280 / 360, visibility=0.9),
+    ]
+    onnx_backend._previous = landmarks
+    x0, y0, side = onnx_backend._roi(640, 360)
+    assert side == pytest.approx(200 * OnnxPoseBackend.roi_scale)
+    assert (x0 + side / 2, y0 + side / 2) == pytest.approx((320, 180))
+
+
+def test_onnx_maps_roi_pixels_back_to_frame(onnx_backend):
+    session = onnx_backend.session
+    # Centre and bottom-right corner of the model input, both visible
+    session.raw[0] = [INPUT_SIZE / 2, INPUT_SIZE / 2, 0, 10, 10]
+    session.raw[1] = [INPUT_SIZE, INPUT_SIZE, INPUT_SIZE, 10, 10]
+
+    landmarks = onnx_backend.process(np.zeros((360, 640, 3), np.uint8))
+
+    # First call letterboxes: ROI is the 640 px square centred on the frame
+    assert (landmarks[0].x, landmarks[0].y) == pytest.approx((0.5, 0.5))
+    assert (landmarks[1].x, landmarks[1].y) == pytest.approx((1.0, 500 / 360))
+    assert landmarks[1].z == pytest.approx(1.0)
+    assert landmarks[0].visibility > 0.99
+    assert session.inputs[-1].shape == (1, INPUT_SIZE, INPUT_SIZE, 3)
+
+
+def test_onnx_follows_previous_pose(onnx_backend):
+    session = onnx_backend.session
+    session.raw[:, 3] = 10
+    # A 100 px tall pose in the middle of the first (640 px) ROI
+    session.raw[:, 0] = INPUT_SIZE / 2
+    session.raw[:, 1] = np.linspace(108, 148, NUM_LANDMARKS)
+    frame = np.zeros((360, 640, 3), np.uint8)
+    first = onnx_backend.process(frame)
+
+    x0, y0, side = onnx_backend._roi(640, 360)
+    ys = [lm.y * 360 for lm in first]
+    assert side == pytest.approx((max(ys) - min(ys)) * OnnxPoseBackend.roi_scale)
+
+    second = onnx_backend.process(frame)
+    # Same model output now maps into the smaller ROI around the person
+    assert second[0].x == pytest.approx((x0 + side / 2) / 640)
+
+
+def test_onnx_low_presence_clears_previous_pose(onnx_backend):
+    onnx_backend._previous = [Landmark(0.5, 0.5, visibility=1.0)] * NUM_LANDMARKS
+    onnx_backend.session.presence = 0.1
+    assert onnx_backend.process(np.zeros((360, 640, 3), np.uint8)) is None
+    assert onnx_backend._previous is None
+
+
+def test_onnx_roi_ignores_collapsed_previous_pose(onnx_backend):
+    onnx_backend._previous = [Landmark(0.5, 0.5, visibility=1.0)] * NUM_LANDMARKS
+    assert onnx_backend._roi(640, 360) == (0.0, -140.0, 640.0)
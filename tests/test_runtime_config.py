@@ -0,0 +1,27 @@
+from backend.runtime_config import RuntimeConfig, parse_cpu_list
+
+
+def test_parse_cpu_list_empty_means_no_pinning():
+    assert parse_cpu_list(None) is None
+    assert parse_cpu_list("") is None
+    assert parse_cpu_list("  ") is None
+
+
+def test_parse_cpu_list_single_cpu():
+    assert parse_cpu_list("0") == frozenset({0})
+
+
+def test_parse_cpu_list_ranges_and_singles():
+    assert parse_cpu_list("1-3,6") == frozenset({1, 2, 3, 6})
+    assert parse_cpu_list(" 0 , 2-3 ,") == frozenset({0, 2, 3})
+
+
+def test_parse_cpu_list_overlapping_parts():
+    assert parse_cpu_list("0-2,1-3") == frozenset({0, 1, 2, 3})
+
+
+def test_inference_slots_follow_the_budget():
+    assert RuntimeConfig(inference_cpus=frozenset({2, 3})).inference_slots() == 2
+    assert RuntimeConfig(inference_cpus=frozenset({0, 1, 2, 3}),
+                         inference_threads=2).inference_slots() == 2
+    assert RuntimeConfig(inference_cpus=frozenset({0}), inference_threads=4).inference_slots() == 1
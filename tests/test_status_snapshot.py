@@ -0,0 +1,193 @@
+from types import SimpleNamespace
+import threading
+import time
+
+import pytest
+
+from backend import camera_owner, session_state
+from backend.camera_owner import CameraOwner
+from backend.session_state import SessionState
+from backend.status_snapshot import (
+    COMMAND_SLOTS,
+    COMMAND_START,
+    COMMAND_STOP,
+    SharedStatus,
+    _STATUS_OFFSET,
+)
+
+
+@pytest.fixture
+def status():
+    shared = SharedStatus(create=True)
+    yield shared
+    shared.close()
+
+
+def _state(**values):
+    state = SessionState()
+    for key, value in values.items():
+        setattr(state, key, value)
+    return state
+
+
+def test_fresh_block_reads_idle(status):
+    snapshot = status.read()
+    assert snapshot.mode == "idle"
+    assert not snapshot.running
+
+
+def test_publish_read_round_trip(status):
+    status.publish(_state(mode="break", remaining=42, reps=7, posture_score=0.75, running=True))
+
+    reader = SharedStatus(status.name)
+    try:
+        snapshot = reader.read()
+    finally:
+        reader.close()
+
+    assert snapshot.mode == "break"
+    assert snapshot.remaining_seconds == 42
+    assert snapshot.reps == 7
+    assert snapshot.posture_score == pytest.approx(0.75)
+    assert snapshot.running
+    assert snapshot.updated_at > 0
+
+
+def test_read_rejects_corrupt_payload(status):
+    status.publish(_state(reps=3))
+    # Flip a payload byte without touching the sequence number
+    status.buf[_STATUS_OFFSET] ^= 0xFF
+    with pytest.raises(TimeoutError):
+        status.read(retries=10)
+
+
+def test_commands_arrive_in_order(status):
+    status.send_command(COMMAND_STOP)
+    status.send_command(COMMAND_START, 60, 30)
+
+    last, commands = status.poll_commands(0)
+    assert [c.command for c in commands] == [COMMAND_STOP, COMMAND_START]
+    assert (commands[1].focus_seconds, commands[1].break_seconds) == (60, 30)
+    assert status.poll_commands(last) == (last, [])
+
+
+def test_command_ring_keeps_newest_when_overrun(status):
+    for i in range(COMMAND_SLOTS + 3):
+        status.send_command(COMMAND_START, i, 0)
+
+    last, commands = status.poll_commands(0)
+    assert last == COMMAND_SLOTS + 3
+    assert [c.focus_seconds for c in commands] == list(range(3, COMMAND_SLOTS + 3))
+
+
+@pytest.fixture
+def fake_loop(monkeypatch):
+    """Replace session_loop with one that needs no camera and records its configs."""
+
+    started = []
+
+    def session_loop(config, state):
+        started.append(config)
+        # Opening the camera takes a while before the loop reports running
+        time.sleep(0.05)
+        state.running = True
+        try:
+            while state.running:
+                time.sleep(0.01)
+        finally:
+            state.running = False
+
+    monkeypatch.setattr(session_state, "session_loop", session_loop)
+    return started
+
+
+def _step_until(owner, predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        owner.step()
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_owner_restarts_after_stop_then_start(status, fake_loop):
+    owner = CameraOwner()
+    status.send_command(COMMAND_START, 10, 5)
+    last, commands = status.poll_commands(0)
+    for command in commands:
+        owner.handle(command)
+    assert _step_until(owner, lambda: owner.state.running)
+    first = owner.loop_thread
+
+    # Both land between two polls while the first loop is still running
+    status.send_command(COMMAND_STOP)
+    status.send_command(COMMAND_START, 20, 5)
+    _, commands = status.poll_commands(last)
+    for command in commands:
+        owner.handle(command)
+
+    assert _step_until(owner, lambda: len(fake_loop) == 2 and owner.state.running)
+    assert not first.is_alive()
+    assert fake_loop[1].focus_seconds == 20
+    owner.close()
+
+
+def test_owner_stop_during_startup_is_not_lost(status, fake_loop):
+    owner = CameraOwner()
+    status.send_command(COMMAND_START, 10, 5)
+    status.send_command(COMMAND_STOP)
+    _, commands = status.poll_commands(0)
+
+    owner.handle(commands[0])
+    owner.step()
+    # The STOP arrives before the loop has set running
+    owner.handle(commands[1])
+    assert _step_until(owner, lambda: owner.loop_thread is None)
+    assert not owner.state.running
+    assert len(fake_loop) == 1
+
+
+def test_run_camera_owner_publishes_state(status, fake_loop):
+    stop_event = threading.Event()
+    thread = threading.Thread(target=camera_owner.run_camera_owner, args=(status.name, stop_event))
+    thread.start()
+    try:
+        status.send_command(COMMAND_START, 10, 5)
+        deadline = time.monotonic() + 2.0
+        while not status.read().running and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert status.read().running
+    finally:
+        stop_event.set()
+        thread.join(5.0)
+    assert not status.read().running
+
+
+@pytest.fixture
+def status_client(status, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from backend import status_server
+
+    monkeypatch.setattr(status_server, "_status", status)
+    return TestClient(status_server.app)
+
+
+def test_status_endpoint_serves_fresh_snapshot(status, status_client):
+    status.publish(_state(mode="focus", remaining=30, reps=2, running=True))
+    body = status_client.get("/session/status").json()
+    assert body["running"] and body["mode"] == "focus"
+    assert not body["stale"]
+
+
+def test_status_endpoint_reports_stale_snapshot_as_idle(status, status_client, monkeypatch):
+    from backend import status_server
+
+    status.publish(_state(mode="focus", remaining=30, reps=2, running=True))
+    later = time.time() + status_server.STALE_AFTER + 1
+    monkeypatch.setattr(status_server, "time", SimpleNamespace(time=lambda: later))
+    body = status_client.get("/session/status").json()
+    assert body["stale"]
+    assert not body["running"] and body["mode"] == "idle"
+    assert body["reps"] == 2